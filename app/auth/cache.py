@@ -0,0 +1,28 @@
+import time
+from typing import NamedTuple
+
+from app.cache import LRUCache
+from app.config import settings
+
+
+class UserSnapshot(NamedTuple):
+    id: int
+    username: str
+
+
+user_cache: LRUCache[int, UserSnapshot] = LRUCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def cache_user(user, token_exp: float | None = None) -> UserSnapshot:
+    snapshot = UserSnapshot(id=user.id, username=user.username)
+    # never keep a user around longer than the token that loaded it is valid
+    ttl = None if token_exp is None else token_exp - time.time()
+    user_cache.set(snapshot.id, snapshot, ttl=ttl)
+    return snapshot
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.invalidate(user_id)
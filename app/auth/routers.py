@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.schemas import Token, UserRegister
 from app.dependencies.dao_dependency import get_session_with_commit
 from app.auth.user_service import AuthService
+from app.rate_limit import RateLimit
 
 from loguru import logger
 router = APIRouter()
@@ -20,14 +21,16 @@ router = APIRouter()
     responses={
         201: {"description": "User created successfully"},
         409: {"description": "User already exists"},
+        429: {"description": "Too many requests from this client"},
     },
+    dependencies=[Depends(RateLimit("auth.register"))],
 )
 async def register(
     user_data: UserRegister,
     session: AsyncSession = Depends(get_session_with_commit),
 ) -> dict[str, str]:
     user = await AuthService.register(session, user_data)
-    logger.info(f"User registered: {user.get('username', 'unknown')}")
+    logger.info("User registered: {}", user.get("username", "unknown"))
     return user
 
 @router.post(
@@ -38,7 +41,9 @@ async def register(
     responses={
         200: {"description": "Login successful, JWT returned"},
         400: {"description": "Incorrect username or password"},
+        429: {"description": "Too many requests from this client"},
     },
+    dependencies=[Depends(RateLimit("auth.login"))],
 )
 async def login(
     session: AsyncSession = Depends(get_session_with_commit),
@@ -46,7 +51,7 @@ async def login(
 ) -> dict[str, str]:
     user = await AuthService.authenticate(session, form_data.username, form_data.password)
     access_token = AuthService.create_token(user.id)
-    logger.info(f"User logged in: {user.username}")
+    logger.info("User logged in: {}", user.username)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
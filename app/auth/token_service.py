@@ -12,14 +12,14 @@ class TokenService:
         expire = now + timedelta(minutes=settings.JWT_EXP_MINUTES)
         payload = data.copy()
         payload.update({"exp": expire, "type": "access"})
-        logger.debug(f"Creating access token with payload: {payload}")
+        logger.debug("Creating access token with payload: {}", payload)
         return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
     @staticmethod
     def decode_token(token: str) -> dict[str, Any] | None:
         try:
             payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-            logger.debug(f"Decoded token payload: {payload}")
+            logger.debug("Decoded token payload: {}", payload)
             return payload
         except JWTError:
             return None 
\ No newline at end of file
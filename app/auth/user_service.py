@@ -1,5 +1,5 @@
 from app.auth.dao import UsersDAO
-from app.auth.utils import get_password_hash, verify_password
+from app.auth.utils import password_hasher
 from app.auth.token_service import TokenService
 from app.auth.schemas import UserRegister, UserRead
 from app.exceptions import UserAlreadyExistsException, IncorrectPasswordException
@@ -11,7 +11,7 @@ class AuthService:
         existing = await dao.find_one_or_none(filters={"username": user_data.username})
         if existing:
             raise UserAlreadyExistsException
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         user = await dao.add({"username": user_data.username, "password_hash": hashed_password})
         return UserRead.model_validate(user).model_dump()
 
@@ -19,8 +19,14 @@ class AuthService:
     async def authenticate(session, username: str, password: str):
         dao = UsersDAO(session)
         user = await dao.find_one_or_none(filters={"username": username})
-        if not user or not verify_password(password, user.password_hash):
+        if not user:
             raise IncorrectPasswordException
+        valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+        if not valid:
+            raise IncorrectPasswordException
+        if new_hash:
+            # BCRYPT_ROUNDS changed since this hash was made; the session dependency commits it
+            user.password_hash = new_hash
         return user
 
     @staticmethod
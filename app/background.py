@@ -0,0 +1,29 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+
+class BackgroundTask(ABC):
+    """One long-running asyncio task per worker, started and stopped by the app's lifespan."""
+
+    _task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def _run(self) -> None:
+        """The task's loop; runs until cancelled."""
+
+    def start(self) -> None:
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -9,6 +10,85 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     JWT_EXP_MINUTES: int
 
+    # comma-separated read replica URLs; empty means every read goes to the primary
+    DB_REPLICA_URLS: str = ""
+    REPLICA_STICKY_SECONDS: float = 5.0
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # connections each engine opens, and prepares the hot statements on, before the worker takes traffic
+    DB_POOL_WARMUP_CONNECTIONS: int = 5
+    # most-clicked links of the last hour loaded into the link cache at startup; 0 disables
+    CACHE_PRELOAD_LINKS: int = 1000
+    # how long startup waits for the cache invalidation listener before skipping the preload
+    CACHE_PRELOAD_TIMEOUT_SECONDS: float = 5.0
+
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
+    REDIRECT_MODE: Literal["cached", "atomic"] = "cached"
+    # serve GET /{short_code} from a raw ASGI route instead of the FastAPI endpoint
+    LEAN_REDIRECT: bool = True
+
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 300.0
+
+    LINK_CACHE_MAX_SIZE: int = 10000
+    LINK_CACHE_TTL_SECONDS: float = 60.0
+
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    CACHE_INVALIDATION_RECONNECT_SECONDS: float = 1.0
+    CACHE_INVALIDATION_KEEPALIVE_SECONDS: float = 30.0
+
+    LINK_BLOOM_ENABLED: bool = True
+    LINK_BLOOM_CAPACITY: int = 1000000
+    LINK_BLOOM_ERROR_RATE: float = 0.001
+    LINK_BLOOM_REBUILD_INTERVAL_SECONDS: float = 3600.0
+
+    LINK_BULK_MAX_ITEMS: int = 1000
+    # reuse the owner's active link for a URL they already shortened instead of issuing a new code
+    LINK_DEDUPE: bool = False
+    LINK_CODE_ALLOCATOR: Literal["random", "sequence"] = "random"
+    LINK_CODE_BLOCK_SIZE: int = 100
+    LINK_CODE_MAX_ATTEMPTS: int = 5
+
+    LINK_EXPIRY_SWEEP_INTERVAL_SECONDS: float = 60.0
+    LINK_EXPIRY_SWEEP_BATCH_SIZE: int = 500
+    LINK_EXPIRY_SWEEP_MODE: Literal["deactivate", "purge"] = "deactivate"
+    # links expired or deactivated longer ago than this are moved to links_archive by `python -m app.maintenance archive`
+    LINK_ARCHIVE_RETENTION_DAYS: int = 30
+    LINK_ARCHIVE_BATCH_SIZE: int = 1000
+
+    CLICK_FLUSH_INTERVAL_SECONDS: float = 1.0
+    CLICK_FLUSH_THRESHOLD: int = 1000
+    STATS_STREAM_CHUNK_SIZE: int = 1000
+
+    CLICK_MINUTE_BUCKET_RETENTION_HOURS: int = 2
+    CLICK_HOUR_BUCKET_RETENTION_DAYS: int = 7
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # requests per minute per client (user id when authenticated, else IP), also the burst size
+    RATE_LIMITS: dict[str, int] = {"auth.register": 20, "auth.login": 30, "links.create": 120, "links.bulk": 20}
+
+    LOG_LEVEL: str = "INFO"
+    LOG_ENQUEUE: bool = True
+    LOG_SERIALIZE: bool = False
+    # JSON object of access log sample rates keyed by route template; redirects keep 1% by default
+    LOG_ACCESS_SAMPLE_RATES: dict[str, float] = {"/{short_code}": 0.01}
+    LOG_ACCESS_SAMPLE_RATE: float = 1.0
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
     model_config = SettingsConfigDict(env_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".env"))
 
 settings = Settings()
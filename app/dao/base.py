@@ -25,8 +25,7 @@ class BaseDAO(Generic[T]):
             query = select(self.model).filter_by(id=data_id)
             result = await self._session.execute(query)
             record = result.scalar_one_or_none()
-            log_message = f"Record {self.model.__name__} with ID {data_id} {'found' if record else 'not found'}."
-            logger.info(log_message)
+            logger.debug("Record {} with ID {} {}.", self.model.__name__, data_id, "found" if record else "not found")
             return record
         except SQLAlchemyError as e:
             logger.error(f"Error finding record with ID {data_id}: {e}")
@@ -34,13 +33,12 @@ class BaseDAO(Generic[T]):
 
     async def find_one_or_none(self, filters: BaseModel):
         filter_dict = dict(filters)
-        logger.info(f"find_one_or_none {self.model.__name__} by filters: {filter_dict}")
+        logger.debug("find_one_or_none {} by filters: {}", self.model.__name__, filter_dict)
         try:
             query = select(self.model).filter_by(**filter_dict)
             result = await self._session.execute(query)
             record = result.scalar_one_or_none()
-            log_message = f"Record {'found' if record else 'not found'} by filters: {filter_dict}"
-            logger.info(log_message)
+            logger.debug("Record {} by filters: {}", "found" if record else "not found", filter_dict)
             return record
         except SQLAlchemyError as e:
             logger.error(f"Error finding record by filters {filter_dict}: {e}")
@@ -48,11 +46,11 @@ class BaseDAO(Generic[T]):
 
     async def add(self, values: BaseModel):
         values_dict = dict(values)
-        logger.info(f"add new record {self.model.__name__} with values: {values_dict}")
+        logger.debug("add new record {} with values: {}", self.model.__name__, values_dict)
         try:
             new_instance = self.model(**values_dict)
             self._session.add(new_instance)
-            logger.info(f"Record {self.model.__name__} added.")
+            logger.debug("Record {} added.", self.model.__name__)
             await self._session.flush()
             return new_instance
         except SQLAlchemyError as e:
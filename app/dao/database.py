@@ -7,7 +7,9 @@ from sqlalchemy import func, TIMESTAMP, Integer, inspect, MetaData
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, declared_attr
 from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine, AsyncSession
 
-from app.config import database_url
+from app.config import database_url, settings
+from app.dao.pool import PoolMetrics, engine_options
+from app.dao.replica import ReadTarget, ReplicaRouter
 
 
 POSTGRES_INDEXES_NAMING_CONVENTION = {
@@ -20,8 +22,37 @@ POSTGRES_INDEXES_NAMING_CONVENTION = {
 
 
 
-engine = create_async_engine(url=database_url)
+pool_metrics = PoolMetrics()
+engine = create_async_engine(url=database_url, **engine_options(pool_metrics))
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _read_target(read_engine) -> ReadTarget:
+    autocommit_engine = read_engine.execution_options(isolation_level="AUTOCOMMIT")
+    return ReadTarget(
+        session_maker=async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False),
+        autocommit_session_maker=async_sessionmaker(autocommit_engine, class_=AsyncSession, expire_on_commit=False),
+        autocommit_engine=autocommit_engine,
+    )
+
+
+replica_pool_metrics = [PoolMetrics() for _ in settings.replica_urls]
+replica_engines = [
+    create_async_engine(url=url, **engine_options(metrics))
+    for url, metrics in zip(settings.replica_urls, replica_pool_metrics)
+]
+replica_router = ReplicaRouter(
+    primary=_read_target(engine),
+    replicas=[_read_target(replica) for replica in replica_engines],
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+)
+
+
+async def dispose_engines() -> None:
+    # closes every pooled connection; the engines reconnect lazily if used again
+    for pool_engine in (engine, *replica_engines):
+        await pool_engine.dispose()
+
 str_uniq = Annotated[str, mapped_column(unique=True, nullable=False)]
 
 
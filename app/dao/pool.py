@@ -0,0 +1,73 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import settings
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record_checkout(self, wait: float, overflowed: bool) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        if overflowed:
+            self.overflow_events += 1
+
+    def snapshot(self, pool) -> dict:
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+        }
+
+
+class InstrumentedPoolMixin:
+    """Times every checkout and counts overflow connections and timeouts.
+
+    Metrics live on the class rather than the instance because SQLAlchemy
+    rebuilds pools through ``recreate()`` with a fixed set of arguments.
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        overflow_before = self._overflow
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        # _overflow counts up from -pool_size, so a positive value after a new connection means overflow
+        overflowed = self._overflow > overflow_before and self._overflow > 0
+        self.metrics.record_checkout(time.perf_counter() - start, overflowed)
+        return record
+
+
+def instrumented_pool_class(metrics: PoolMetrics, base=AsyncAdaptedQueuePool) -> type:
+    return type(f"Instrumented{base.__name__}", (InstrumentedPoolMixin, base), {"metrics": metrics})
+
+
+def engine_options(metrics: PoolMetrics) -> dict:
+    return {
+        "poolclass": instrumented_pool_class(metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+    }
@@ -0,0 +1,49 @@
+import itertools
+import time
+from typing import Callable, NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.cache import LRUCache
+
+
+class ReadTarget(NamedTuple):
+    # transactional sessions are needed for server-side cursors; autocommit
+    # sessions skip the BEGIN/COMMIT round trips around plain SELECTs
+    session_maker: async_sessionmaker
+    autocommit_session_maker: async_sessionmaker
+    # for handlers that skip the ORM session and take a connection straight from the pool
+    autocommit_engine: AsyncEngine
+
+
+class ReplicaRouter:
+    """Picks the database for read-only work.
+
+    Reads are spread round-robin over the replicas. A user who wrote
+    within the last ``sticky_seconds`` reads from the primary, so they
+    always see their own writes despite replication lag.
+    """
+
+    def __init__(self, primary: ReadTarget, replicas: list[ReadTarget], sticky_seconds: float,
+                 max_tracked_users: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.primary = primary
+        self.replicas = replicas
+        self._cycle = itertools.cycle(replicas) if replicas else None
+        self._recent_writers: LRUCache[int, bool] | None = None
+        if sticky_seconds > 0:
+            self._recent_writers = LRUCache(max_size=max_tracked_users, ttl=sticky_seconds, clock=clock)
+
+    def mark_write(self, user_id: int) -> None:
+        if self._cycle is not None and self._recent_writers is not None:
+            self._recent_writers.set(user_id, True)
+
+    def route(self, user_id: int | None = None) -> ReadTarget:
+        if self._cycle is None:
+            return self.primary
+        if user_id is not None and self._recent_writers is not None and self._recent_writers.get(user_id):
+            return self.primary
+        return next(self._cycle)
+
+    def session_maker(self, user_id: int | None = None, autocommit: bool = True) -> async_sessionmaker:
+        target = self.route(user_id)
+        return target.autocommit_session_maker if autocommit else target.session_maker
@@ -1,10 +1,9 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from sqlalchemy.ext.asyncio import AsyncSession
-
+from app.auth.cache import user_cache, cache_user
 from app.auth.dao import UsersDAO
-from app.dependencies.dao_dependency import get_session_with_commit
+from app.dao.database import replica_router
 from app.auth.token_service import TokenService
 from app.exceptions import InvalidTokenException, UserNotFoundException
 
@@ -13,18 +12,22 @@ from loguru import logger
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session_with_commit)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     payload = TokenService.decode_token(token)
-    logger.debug(f"Decoded token payload: {payload}")
     if not payload or "sub" not in payload:
         logger.error("Invalid token payload or missing 'sub' field")
         raise InvalidTokenException
     user_id = int(payload["sub"])
-    dao = UsersDAO(session)
-    logger.debug(f"Fetching user with ID: {user_id}")
-    user = await dao.find_one_or_none(filters={"id": user_id})
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    logger.debug("Fetching user with ID: {}", user_id)
+    # autocommit on the primary: no BEGIN/COMMIT, and a user who just registered is found before the replicas
+    # catch up. The connection goes back to the pool before the route runs and checks out its own.
+    async with replica_router.primary.autocommit_session_maker() as session:
+        user = await UsersDAO(session).find_one_or_none(filters={"id": user_id})
     if not user:
         raise UserNotFoundException
-    return user
+    return cache_user(user, payload.get("exp"))
 
 
@@ -2,7 +2,7 @@ from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dao.database import async_session_maker
+from app.dao.database import async_session_maker, replica_router
 
 from loguru import logger
 
@@ -31,4 +31,14 @@ async def get_session_without_commit() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with replica_router.session_maker()() as session:
+        try:
+            logger.debug("Starting a new read-only database session")
+            yield session
+        finally:
+            await session.close()
+
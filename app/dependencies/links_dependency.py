@@ -1,9 +1,13 @@
+from datetime import datetime
+
 from fastapi import Depends, Query
 
 from app.links.dao import LinksDAO
+from app.dao.database import replica_router
 from app.dependencies.dao_dependency import get_session_with_commit
 from app.dependencies.auth_dependency import get_current_user
-from app.exceptions import ForbiddenException, LinkNotFoundException
+from app.exceptions import ForbiddenException, LinkNotFoundException, InvalidCursorException
+from app.links.utils import decode_cursor
 
 from loguru import logger
 
@@ -11,9 +15,27 @@ def get_pagination_params(skip: int = Query(0, ge=0), limit: int = Query(10, gt=
 
     return skip, limit
 
+def get_cursor_param(
+        cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page")
+) -> tuple[datetime, int] | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise InvalidCursorException
+
+async def get_user_read_session(current_user=Depends(get_current_user)):
+    # users who just wrote stay on the primary until the replicas have caught up
+    async with replica_router.session_maker(current_user.id)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
 async def get_link_by_code(short_code: str, session=Depends(get_session_with_commit)) -> LinksDAO:
     dao = LinksDAO(session)
-    logger.debug(f"Fetching link with short code: {short_code}")
+    logger.debug("Fetching link with short code: {}", short_code)
     link = await dao.find_one_or_none_by_field(short_code=short_code)
     if not link:
         raise LinkNotFoundException
@@ -21,7 +43,7 @@ async def get_link_by_code(short_code: str, session=Depends(get_session_with_com
 
 async def get_owned_link(short_code: str, current_user=Depends(get_current_user), session=Depends(get_session_with_commit)) -> LinksDAO:
     link = await get_link_by_code(short_code, session)
-    logger.debug(f"Checking ownership of link {link.short_code} for user {current_user.id}")
+    logger.debug("Checking ownership of link {} for user {}", link.short_code, current_user.id)
     if link.owner_id != current_user.id:
         raise ForbiddenException
     return link
\ No newline at end of file
@@ -1,3 +1,5 @@
+import math
+
 from fastapi import status, HTTPException
 
 
@@ -28,6 +30,11 @@ IncorrectPasswordException = HTTPException(
     detail='Wrong password'
 )
 
+PasswordHashingBusyException = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail='Too many authentication requests, try again later'
+)
+
 ForbiddenException = HTTPException(
     status_code=status.HTTP_403_FORBIDDEN,
     detail='Do not have permission to perform this action'
@@ -38,8 +45,21 @@ LinkNotFoundException = HTTPException(
     detail='Link not found or expired'
 )
 
+InvalidCursorException = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail='Invalid pagination cursor'
+)
 
+ShortCodeAllocationException = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail='Could not allocate unique short codes, try again'
+)
 
 
-
-
+class RateLimitExceededException(AppBaseException):
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail='Too many requests, try again later',
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Callable
+
+import asyncpg
+from sqlalchemy import func, select, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import make_url
+
+from app.auth.cache import user_cache, invalidate_user
+from app.background import BackgroundTask
+from app.config import settings, database_url
+from app.links.bloom import short_code_filter
+from app.links.cache import invalidate_link, flush_links
+
+from loguru import logger
+
+
+async def publish_invalidation(session, kind: str, *keys) -> None:
+    """Queue a cache invalidation for every worker, one notification per key.
+
+    NOTIFY is transactional: listeners only see the events once the session
+    commits, so no worker can reload the old row before the change lands.
+    """
+    payloads = bindparam("payloads", [f"{kind}:{key}" for key in keys], type_=ARRAY(String))
+    await session.execute(select(func.pg_notify(settings.CACHE_INVALIDATION_CHANNEL, func.unnest(payloads))))
+
+
+def asyncpg_dsn(url: str) -> str:
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class InvalidationListener(BackgroundTask):
+    """Evicts local cache entries when another worker publishes a change.
+
+    Runs one dedicated asyncpg connection outside the pool. Notifications
+    sent while it is disconnected are lost, so every handler's full flush
+    runs after a reconnect.
+    """
+
+    def __init__(self, dsn: str, channel: str, reconnect_interval: float, keepalive_interval: float,
+                 connect: Callable = asyncpg.connect):
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_interval = reconnect_interval
+        self.keepalive_interval = keepalive_interval
+        self._connect = connect
+        self._handlers: dict[str, tuple[Callable[[str], None], Callable[[], None]]] = {}
+        self.connected = asyncio.Event()
+        # counts subscriptions, so state built while subscribed can tell if a reconnect happened since
+        self.connections = 0
+        self.notifications = 0
+        self.reconnects = 0
+
+    def register(self, kind: str, evict: Callable[[str], None], flush: Callable[[], None]) -> None:
+        self._handlers[kind] = (evict, flush)
+
+    def dispatch(self, payload: str) -> None:
+        kind, _, key = payload.partition(":")
+        handler = self._handlers.get(kind)
+        if handler is None:
+            logger.warning("Ignoring cache invalidation of unknown kind: {}", kind)
+            return
+        self.notifications += 1
+        handler[0](key)
+
+    def flush_all(self) -> None:
+        for _, flush in self._handlers.values():
+            flush()
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        self.dispatch(payload)
+
+    async def _listen_once(self, reconnecting: bool) -> None:
+        connection = await self._connect(self.dsn)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            await connection.add_listener(self.channel, self._on_notification)
+            if reconnecting:
+                # anything published while we were away was missed
+                self.flush_all()
+            self.connections += 1
+            self.connected.set()
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=self.keepalive_interval)
+                except asyncio.TimeoutError:
+                    # a half-open TCP connection never reports termination on its own
+                    await asyncio.wait_for(connection.execute("SELECT 1"), timeout=self.keepalive_interval)
+        finally:
+            self.connected.clear()
+            if not connection.is_closed():
+                connection.terminate()
+
+    async def _run(self) -> None:
+        reconnecting = False
+        while True:
+            try:
+                await self._listen_once(reconnecting)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("Cache invalidation listener disconnected: {}", e)
+            reconnecting = True
+            self.reconnects += 1
+            await asyncio.sleep(self.reconnect_interval)
+
+
+invalidation_listener = InvalidationListener(
+    dsn=asyncpg_dsn(database_url),
+    channel=settings.CACHE_INVALIDATION_CHANNEL,
+    reconnect_interval=settings.CACHE_INVALIDATION_RECONNECT_SECONDS,
+    keepalive_interval=settings.CACHE_INVALIDATION_KEEPALIVE_SECONDS,
+)
+invalidation_listener.register("link", invalidate_link, flush_links)
+invalidation_listener.register("user", lambda key: invalidate_user(int(key)), user_cache.clear)
+# new codes from other workers; a missed one would be a false 404, so the filter only answers
+# while this subscription is up and was built after it started
+invalidation_listener.register("code", short_code_filter.add, short_code_filter.reset)
+short_code_filter.follow(invalidation_listener)
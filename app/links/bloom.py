@@ -0,0 +1,183 @@
+import asyncio
+import math
+import time
+from collections import deque
+from hashlib import blake2b
+
+from sqlalchemy import select, text
+
+from app.background import BackgroundTask
+from app.config import settings
+from app.dao.database import async_session_maker
+from app.links.models import Link
+
+from loguru import logger
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing of one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> None:
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    def false_positive_rate(self) -> float:
+        # expected rate for the number of keys added so far
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class ShortCodeFilter(BackgroundTask):
+    """Bloom filter of every issued short code, used to turn away scans for codes that never existed.
+
+    Until the first build finishes, or after ``reset()``, every code is
+    reported as possibly present, so the filter can only ever skip lookups
+    that would have missed. Codes issued by other workers arrive through the
+    invalidation listener passed to ``follow()``: while it is disconnected,
+    or until a build started after its current subscription, the filter
+    passes everything too. A rebuild streams ``links.short_code`` into a new
+    filter and replays codes added since shortly before it started: a code
+    added by a transaction that had not committed when the scan's snapshot
+    was taken would otherwise be missing from the new filter.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, rebuild_interval: float, chunk_size: int,
+                 replay_window: float = 60.0, session_factory=async_session_maker, clock=time.monotonic):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.chunk_size = chunk_size
+        self.replay_window = replay_window
+        self._session_factory = session_factory
+        self._clock = clock
+        self._filter: BloomFilter | None = None
+        self._listener = None
+        self._built_for = 0
+        self._recent: deque[tuple[float, str]] = deque()
+        self._rebuild_requested = asyncio.Event()
+        self._generation = 0
+        self.rejected = 0
+        self.rebuilds = 0
+
+    def follow(self, listener) -> None:
+        self._listener = listener
+
+    def _subscription(self) -> int | None:
+        listener = self._listener
+        if listener is None:
+            return 0
+        return listener.connections if listener.connected.is_set() else None
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None and self._built_for == self._subscription()
+
+    def might_contain(self, short_code: str) -> bool:
+        if not self.ready or short_code in self._filter:
+            return True
+        self.rejected += 1
+        return False
+
+    def add(self, short_code: str) -> None:
+        now = self._clock()
+        self._recent.append((now, short_code))
+        while self._recent and self._recent[0][0] < now - self.replay_window:
+            self._recent.popleft()
+        if self._filter is not None:
+            self._filter.add(short_code)
+
+    def reset(self) -> None:
+        # codes may have been issued without reaching us; stop filtering until rebuilt
+        self._filter = None
+        self._generation += 1
+        self._rebuild_requested.set()
+
+    async def rebuild(self) -> bool:
+        if self._listener is not None:
+            # codes issued between the snapshot and the LISTEN would never reach the filter
+            await self._listener.connected.wait()
+        subscription = self._subscription()
+        started = self._clock()
+        generation = self._generation
+        async with self._session_factory() as session:
+            estimate = await session.scalar(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'links'::regclass"))
+            bloom = BloomFilter(max(self.capacity, 2 * int(estimate or 0)), self.error_rate)
+            result = await session.stream(select(Link.short_code).execution_options(yield_per=self.chunk_size))
+            async for codes in result.scalars().partitions():
+                for short_code in codes:
+                    bloom.add(short_code)
+                # the scan is CPU-bound; let requests in between chunks
+                await asyncio.sleep(0)
+        if generation != self._generation or subscription != self._subscription():
+            # reset() or a reconnect while scanning: the snapshot may predate codes we missed
+            return False
+        for added_at, short_code in self._recent:
+            if added_at >= started - self.replay_window:
+                bloom.add(short_code)
+        self._filter = bloom
+        self._built_for = subscription
+        self.rebuilds += 1
+        logger.info("Short code filter rebuilt with {} codes ({} bytes)", bloom.count, bloom.size_bytes)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            self._rebuild_requested.clear()
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Short code filter rebuild failed: {e}")
+            try:
+                await asyncio.wait_for(self._rebuild_requested.wait(), timeout=self.rebuild_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    @property
+    def enabled(self) -> bool:
+        return self.rebuild_interval > 0
+
+    def stats(self) -> dict[str, float]:
+        bloom = self._filter
+        return {
+            "ready": int(self.ready),
+            "size_bytes": bloom.size_bytes if bloom else 0,
+            "capacity": bloom.capacity if bloom else 0,
+            # includes codes echoed back by our own notifications, so an upper bound
+            "added": bloom.count if bloom else 0,
+            "false_positive_rate": bloom.false_positive_rate() if bloom else 0.0,
+            "rejected": self.rejected,
+            "rebuilds": self.rebuilds,
+        }
+
+
+short_code_filter = ShortCodeFilter(
+    capacity=settings.LINK_BLOOM_CAPACITY,
+    error_rate=settings.LINK_BLOOM_ERROR_RATE,
+    rebuild_interval=settings.LINK_BLOOM_REBUILD_INTERVAL_SECONDS if settings.LINK_BLOOM_ENABLED else 0,
+    chunk_size=settings.STATS_STREAM_CHUNK_SIZE,
+)
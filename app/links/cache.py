@@ -0,0 +1,59 @@
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+from app.cache import LRUCache
+from app.config import settings
+
+
+class CachedLink(NamedTuple):
+    short_code: str
+    orig_url: str
+    is_active: bool
+    expires_at: datetime | None
+
+
+link_cache: LRUCache[str, CachedLink] = LRUCache(
+    max_size=settings.LINK_CACHE_MAX_SIZE,
+    ttl=settings.LINK_CACHE_TTL_SECONDS,
+)
+
+# a replica that has not replayed an invalidated change yet would put the old row back for a full TTL,
+# so evicted codes are reloaded from the primary for as long as a writer's own reads are
+recently_invalidated: LRUCache[str, bool] = LRUCache(
+    max_size=settings.LINK_CACHE_MAX_SIZE,
+    ttl=settings.REPLICA_STICKY_SECONDS,
+)
+_flushed_at = float("-inf")
+
+
+def cache_link(link) -> CachedLink:
+    entry = CachedLink(
+        short_code=link.short_code,
+        orig_url=link.orig_url,
+        is_active=link.is_active,
+        expires_at=link.expires_at,
+    )
+    ttl = None
+    if entry.expires_at is not None:
+        ttl = (entry.expires_at - datetime.now()).total_seconds()
+    link_cache.set(entry.short_code, entry, ttl=ttl)
+    return entry
+
+
+def invalidate_link(short_code: str) -> None:
+    link_cache.invalidate(short_code)
+    recently_invalidated.set(short_code, True)
+
+
+def flush_links() -> None:
+    # after missed invalidations any code may have changed
+    global _flushed_at
+    link_cache.clear()
+    _flushed_at = time.monotonic()
+
+
+def reload_from_primary(short_code: str) -> bool:
+    if time.monotonic() - _flushed_at < settings.REPLICA_STICKY_SECONDS:
+        return True
+    return recently_invalidated.get(short_code) is not None
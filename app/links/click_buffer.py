@@ -0,0 +1,119 @@
+import asyncio
+import time
+from datetime import datetime
+from operator import itemgetter
+
+from app.background import BackgroundTask
+from app.config import settings
+from app.dao.database import async_session_maker
+from app.links.dao import LinksDAO
+
+from loguru import logger
+
+
+class ClickBuffer(BackgroundTask):
+    """Write-behind aggregation of redirect clicks.
+
+    Increments are collected per short code and flushed as one batched
+    ``UPDATE ... SET click_count = click_count + n`` either every
+    ``flush_interval`` seconds or once ``flush_threshold`` clicks are pending.
+    The same flush upserts per-minute and per-hour rollup buckets.
+    """
+
+    def __init__(self, flush_interval: float, flush_threshold: int, session_factory=async_session_maker):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._session_factory = session_factory
+        self._pending: dict[str, int] = {}
+        self._buckets: dict[tuple[str, int], int] = {}
+        self._pending_clicks = 0
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self.flushed_clicks = 0
+        self.flushes = 0
+
+    @property
+    def pending_clicks(self) -> int:
+        return self._pending_clicks
+
+    def add(self, short_code: str, clicks: int = 1, counted: bool = False) -> None:
+        # counted=True means click_count was already bumped in the database (atomic redirect mode)
+        if not counted:
+            self._pending[short_code] = self._pending.get(short_code, 0) + clicks
+        key = (short_code, int(time.time() // 60))
+        self._buckets[key] = self._buckets.get(key, 0) + clicks
+        self._pending_clicks += clicks
+        if self._pending_clicks >= self.flush_threshold and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def _requeue(self, counts: dict[str, int], buckets: dict[tuple[str, int], int]) -> None:
+        for short_code, clicks in counts.items():
+            self._pending[short_code] = self._pending.get(short_code, 0) + clicks
+        for key, clicks in buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + clicks
+            self._pending_clicks += clicks
+
+    @staticmethod
+    def _bucket_rows(buckets: dict[tuple[str, int], int]) -> list[dict]:
+        hours: dict[tuple[str, int], int] = {}
+        rows = []
+        for (short_code, minute), clicks in buckets.items():
+            rows.append({
+                "code": short_code,
+                "granularity": "minute",
+                "bucket_start": datetime.fromtimestamp(minute * 60),
+                "clicks": clicks,
+            })
+            hour_key = (short_code, minute // 60)
+            hours[hour_key] = hours.get(hour_key, 0) + clicks
+        for (short_code, hour), clicks in hours.items():
+            rows.append({
+                "code": short_code,
+                "granularity": "hour",
+                "bucket_start": datetime.fromtimestamp(hour * 3600),
+                "clicks": clicks,
+            })
+        # the upsert locks existing buckets; one global order keeps concurrent flushes from deadlocking
+        rows.sort(key=itemgetter("code", "granularity", "bucket_start"))
+        return rows
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._buckets:
+                return 0
+            counts, self._pending = self._pending, {}
+            buckets, self._buckets = self._buckets, {}
+            clicks = self._pending_clicks
+            self._pending_clicks = 0
+            try:
+                async with self._session_factory() as session:
+                    dao = LinksDAO(session)
+                    await dao.add_clicks(counts)
+                    await dao.add_click_buckets(self._bucket_rows(buckets))
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Click flush failed, {clicks} clicks re-queued: {e}")
+                self._requeue(counts, buckets)
+                return 0
+            self.flushes += 1
+            self.flushed_clicks += clicks
+            return clicks
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+        if self._buckets:
+            logger.error(f"Dropping {self._pending_clicks} unflushed clicks on shutdown")
+
+
+click_buffer = ClickBuffer(
+    flush_interval=settings.CLICK_FLUSH_INTERVAL_SECONDS,
+    flush_threshold=settings.CLICK_FLUSH_THRESHOLD,
+)
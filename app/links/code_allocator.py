@@ -0,0 +1,104 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.links.utils import generate_short_code, encode_base62, decode_base62
+
+from loguru import logger
+
+MAX_LINK_ID = 2 ** 31 - 1
+
+
+class CodeAllocator(ABC):
+    """Hands out short codes, optionally together with the link primary key."""
+
+    @abstractmethod
+    async def allocate(self, session, count: int) -> list[tuple[int | None, str]]:
+        """Return ``count`` (link id or None, short code) pairs."""
+
+    def decode(self, short_code: str) -> int | None:
+        return None
+
+    @abstractmethod
+    def sample_code(self) -> str:
+        """A code shaped like the issued ones, so lookups built from it compile to the same SQL."""
+
+
+class RandomCodeAllocator(CodeAllocator):
+    def __init__(self, length: int = 8):
+        self.length = length
+
+    async def allocate(self, session, count: int) -> list[tuple[int | None, str]]:
+        return [(None, generate_short_code(self.length)) for _ in range(count)]
+
+    def sample_code(self) -> str:
+        return "0" * self.length
+
+
+class SequenceCodeAllocator(CodeAllocator):
+    """Base62 codes derived from ``links.id`` values leased in blocks.
+
+    Each worker reserves ``block_size`` ids from the links id sequence in one
+    round trip and spends them locally, so inserts never coordinate and never
+    collide. Ids are scrambled with an invertible multiplication modulo
+    ``62 ** length`` so consecutive links do not get sequential-looking codes, and a
+    code can be decoded straight back to its primary key.
+    """
+
+    # 7 characters keep sequence codes apart from the 8-character random ones
+    LENGTH = 7
+    SPACE = 62 ** LENGTH
+    MULTIPLIER = 2654435761
+    INVERSE = pow(MULTIPLIER, -1, SPACE)
+
+    def __init__(self, block_size: int = 100, sequence: str = "links_id_seq"):
+        self.block_size = block_size
+        self.sequence = sequence
+        self._ids: deque[int] = deque()
+        self._lock = asyncio.Lock()
+
+    async def _lease(self, session, count: int) -> None:
+        result = await session.execute(
+            text("SELECT nextval(CAST(:sequence AS regclass)) FROM generate_series(1, :count)"),
+            {"sequence": self.sequence, "count": count},
+        )
+        self._ids.extend(result.scalars().all())
+        logger.debug("Leased {} link ids from {}", count, self.sequence)
+
+    async def allocate(self, session, count: int) -> list[tuple[int | None, str]]:
+        async with self._lock:
+            if len(self._ids) < count:
+                await self._lease(session, max(self.block_size, count - len(self._ids)))
+            ids = [self._ids.popleft() for _ in range(count)]
+        return [(link_id, self.encode(link_id)) for link_id in ids]
+
+    def encode(self, link_id: int) -> str:
+        return encode_base62(link_id * self.MULTIPLIER % self.SPACE, self.LENGTH)
+
+    def decode(self, short_code: str) -> int | None:
+        if len(short_code) != self.LENGTH:
+            return None
+        try:
+            link_id = decode_base62(short_code) * self.INVERSE % self.SPACE
+        except ValueError:
+            return None
+        return link_id if 0 < link_id <= MAX_LINK_ID else None
+
+    def sample_code(self) -> str:
+        return self.encode(MAX_LINK_ID)
+
+
+_allocator: CodeAllocator | None = None
+
+
+def get_code_allocator() -> CodeAllocator:
+    global _allocator
+    if _allocator is None:
+        if settings.LINK_CODE_ALLOCATOR == "sequence":
+            _allocator = SequenceCodeAllocator(block_size=settings.LINK_CODE_BLOCK_SIZE)
+        else:
+            _allocator = RandomCodeAllocator()
+    return _allocator
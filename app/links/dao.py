@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, bindparam, func, and_, or_, tuple_, literal, true, false, String, DateTime, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.dao.base import BaseDAO
-from app.links.models import Link
-from app.links.utils import generate_short_code
+from app.links.models import Link, LinkClickBucket, Url, ArchivedLink
+from app.links.code_allocator import get_code_allocator
+from app.links.utils import normalize_url, url_digest
 
 from loguru import logger
 
@@ -13,52 +15,216 @@ from loguru import logger
 class LinksDAO(BaseDAO):
     model = Link
 
-    async def create_link(self, orig_url: str, owner_id: int):
-        logger.info(f"Creating link for URL: {orig_url} with owner ID: {owner_id}")
-        try:
-            short_code = generate_short_code()
-            expires_at = datetime.now() + timedelta(days=1)
-            link = Link(
-                short_code=short_code,
-                orig_url=str(orig_url),
-                is_active=True,
-                created_at=datetime.now(),
-                expires_at=expires_at,
-                click_count=0,
-                owner_id=owner_id
+    async def create_link(self, orig_url: str, owner_id: int, max_attempts: int = 5, dedupe: bool = False):
+        created = await self.create_links([orig_url], owner_id=owner_id, max_attempts=max_attempts, dedupe=dedupe)
+        link = created[0]
+        if link is not None:
+            logger.debug("Link created with short code: {} for owner ID: {}", link.short_code, owner_id)
+        return link
+
+    async def intern_urls(self, urls: list[str], max_attempts: int = 3) -> dict[bytes, int]:
+        """Return the ``urls`` row id for every URL, keyed by its digest, inserting the missing ones."""
+        table = Url.__table__
+        pending = {url_digest(url): url for url in urls}
+        interned = {}
+        for _ in range(max_attempts):
+            # one round trip: new rows come back from the INSERT, existing ones from the SELECT.
+            # A row committed concurrently is skipped by both, so it is picked up on the next pass
+            inserted = (
+                insert(table)
+                .values([{"url_hash": digest, "url": url} for digest, url in pending.items()])
+                .on_conflict_do_nothing(index_elements=["url_hash"])
+                .returning(table.c.id, table.c.url_hash)
+                .cte("inserted")
+            )
+            query = select(inserted.c.id, inserted.c.url_hash).union_all(
+                select(table.c.id, table.c.url_hash).where(table.c.url_hash.in_(list(pending)))
             )
-            self._session.add(link)
-            await self._session.commit()
-            await self._session.refresh(link)
-            log_message = f"Link created with short code: {short_code} for owner ID: {owner_id}"
-            logger.info(log_message)
-            return link
+            result = await self._session.execute(query)
+            for row in result.all():
+                interned[row.url_hash] = row.id
+            pending = {digest: url for digest, url in pending.items() if digest not in interned}
+            if not pending:
+                return interned
+        raise SQLAlchemyError(f"Could not intern {len(pending)} URLs")
+
+    @staticmethod
+    def _with_orig_url(links):
+        # links rows plus their interned URL, the shape every created or reused link row has
+        urls = Url.__table__
+        return select(*links.c, urls.c.url.label("orig_url")).join_from(links, urls, urls.c.id == links.c.url_id)
+
+    async def find_active_by_url_ids(self, owner_id: int, url_ids: list[int]) -> dict[int, object]:
+        table = self.model.__table__
+        query = (
+            self._with_orig_url(table)
+            .where(
+                table.c.owner_id == owner_id,
+                table.c.url_id.in_(url_ids),
+                table.c.is_active.is_(True),
+                table.c.expires_at > datetime.now(),
+            )
+            # newest link per URL
+            .distinct(table.c.url_id)
+            .order_by(table.c.url_id, table.c.created_at.desc())
+        )
+        result = await self._session.execute(query)
+        return {row.url_id: row for row in result.all()}
+
+    async def lock_owner_urls(self, owner_id: int, url_ids: list[int]) -> None:
+        # held until commit; sorted, so batches sharing URLs take the locks in the same order and cannot deadlock
+        ids = bindparam("url_ids", sorted(set(url_ids)), type_=ARRAY(Integer))
+        await self._session.execute(select(func.pg_advisory_xact_lock(owner_id, func.unnest(ids))))
+
+    async def create_links(self, orig_urls: list[str], owner_id: int, max_attempts: int = 5, dedupe: bool = False):
+        # one multi-row INSERT per attempt; codes that collide are skipped by ON CONFLICT
+        # and regenerated together in the next round
+        logger.debug("Creating {} links for owner ID: {}", len(orig_urls), owner_id)
+        allocator = get_code_allocator()
+        table = self.model.__table__
+        now = datetime.now()
+        expires_at = now + timedelta(days=1)
+        created = [None] * len(orig_urls)
+        try:
+            normalized = [normalize_url(str(url)) for url in orig_urls]
+            interned = await self.intern_urls(normalized)
+            url_ids = [interned[url_digest(url)] for url in normalized]
+            remaining = list(range(len(orig_urls)))
+            if dedupe:
+                # two requests for the same owner and URL would otherwise both miss the lookup and both insert;
+                # the second waits here until the first commits, and its lookup then finds the new link
+                await self.lock_owner_urls(owner_id, url_ids)
+                existing = await self.find_active_by_url_ids(owner_id, list(set(url_ids)))
+                created = [existing.get(url_id) for url_id in url_ids]
+                # a URL repeated within the batch gets a single new link
+                first_index = {}
+                for index, url_id in enumerate(url_ids):
+                    if created[index] is None:
+                        first_index.setdefault(url_id, index)
+                remaining = sorted(first_index.values())
+            for _ in range(max_attempts):
+                if not remaining:
+                    break
+                allocations = await allocator.allocate(self._session, len(remaining))
+                codes = {}
+                ids = {}
+                for (link_id, short_code), index in zip(allocations, remaining):
+                    codes[short_code] = index
+                    ids[short_code] = link_id
+                inserted = (
+                    insert(table)
+                    .values([
+                        {
+                            **({"id": ids[short_code]} if ids[short_code] is not None else {}),
+                            "short_code": short_code,
+                            "url_id": url_ids[index],
+                            "is_active": True,
+                            "created_at": now,
+                            "expires_at": expires_at,
+                            "click_count": 0,
+                            "owner_id": owner_id,
+                        }
+                        for short_code, index in codes.items()
+                    ])
+                    .on_conflict_do_nothing(index_elements=["short_code"])
+                    .returning(*table.c)
+                    .cte("inserted")
+                )
+                result = await self._session.execute(self._with_orig_url(inserted))
+                for row in result.all():
+                    created[codes[row.short_code]] = row
+                remaining = [index for index in remaining if created[index] is None]
+            if remaining:
+                logger.error(f"Could not allocate short codes for {len(remaining)} links of owner ID: {owner_id}")
+            if dedupe:
+                by_url = {url_ids[index]: row for index, row in enumerate(created) if row is not None}
+                created = [by_url.get(url_id) for url_id in url_ids]
+            return created
         except SQLAlchemyError as e:
-            logger.error(f"Error creating link: {e}")
-            await self._session.rollback()
+            logger.error(f"Error creating links in bulk: {e}")
             raise
 
+    def _short_code_filter(self, short_code: str):
+        columns = self.model.__table__.c
+        criteria = [columns.short_code == short_code]
+        # codes issued by the sequence allocator decode to the primary key;
+        # short_code is still compared so a guessed code never matches another row
+        link_id = get_code_allocator().decode(short_code)
+        if link_id is not None:
+            criteria.insert(0, columns.id == link_id)
+        return and_(*criteria)
+
     async def get_by_short_code(self, short_code: str):
         try:
-            query = select(self.model).where(self.model.short_code == short_code)
+            query = select(self.model).where(self._short_code_filter(short_code))
             result = await self._session.execute(query)
-            log_message = f"Retrieving link by short code: {short_code}"
-            logger.info(log_message)
+            logger.debug("Retrieving link by short code: {}", short_code)
             return result.scalars().first()
         except SQLAlchemyError as e:
             logger.error(f"Error retrieving link by short code {short_code}: {e}")
             raise
 
+    async def resolve(self, short_code: str):
+        # Core row with just what a redirect needs; also works on a bare AsyncConnection
+        columns = self.model.__table__.c
+        urls = Url.__table__
+        query = (
+            select(columns.short_code, urls.c.url.label("orig_url"), columns.is_active, columns.expires_at)
+            .join_from(self.model.__table__, urls, urls.c.id == columns.url_id)
+            .where(self._short_code_filter(short_code))
+        )
+        try:
+            result = await self._session.execute(query)
+            return result.first()
+        except SQLAlchemyError as e:
+            logger.error(f"Error resolving link {short_code}: {e}")
+            raise
+
+    async def get_hot_links(self, since: datetime, limit: int):
+        # most-clicked live links according to the hour rollups; rows shaped like resolve()
+        table = self.model.__table__
+        buckets = LinkClickBucket.__table__
+        urls = Url.__table__
+        query = (
+            select(table.c.short_code, urls.c.url.label("orig_url"), table.c.is_active, table.c.expires_at)
+            .select_from(buckets.join(table, table.c.id == buckets.c.link_id).join(urls, urls.c.id == table.c.url_id))
+            .where(
+                buckets.c.granularity == "hour",
+                buckets.c.bucket_start >= since,
+                table.c.is_active.is_(True),
+                table.c.expires_at > datetime.now(),
+            )
+            .group_by(table.c.id, urls.c.url)
+            .order_by(func.sum(buckets.c.clicks).desc())
+            .limit(limit)
+        )
+        try:
+            result = await self._session.execute(query)
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving hot links: {e}")
+            raise
+
     async def get_links_for_user(self, owner_id: int, is_active: bool | None = None, skip: int = 0,
-                                 limit: int = 10):
+                                 limit: int = 10, cursor: tuple[datetime, int] | None = None):
         try:
             query = select(self.model).where(self.model.owner_id == owner_id)
-            if is_active is not None:
-                query = query.where(self.model.is_active == is_active)
-            query = query.offset(skip).limit(limit)
+            # an expired link is reported as inactive even before the sweeper flips the flag
+            now = datetime.now()
+            if is_active is True:
+                query = query.where(self.model.is_active.is_(True), self.model.expires_at > now)
+            elif is_active is False:
+                query = query.where(or_(self.model.is_active.is_(False), self.model.expires_at <= now))
+            # newest first; id breaks ties between links created in the same batch
+            if cursor is not None:
+                query = query.where(tuple_(self.model.created_at, self.model.id) < tuple_(*cursor))
+            query = query.order_by(self.model.created_at.desc(), self.model.id.desc())
+            if skip:
+                query = query.offset(skip)
+            query = query.limit(limit)
             result = await self._session.execute(query)
-            log_message = f"Retrieving links for user ID: {owner_id}, active: {is_active}, skip: {skip}, limit: {limit}"
-            logger.info(log_message)
+            logger.debug("Retrieving links for user ID: {}, active: {}, skip: {}, cursor: {}, limit: {}",
+                         owner_id, is_active, skip, cursor, limit)
             return result.scalars().all()
         except SQLAlchemyError as e:
             logger.error(f"Error retrieving links for user {owner_id}: {e}")
@@ -66,46 +232,235 @@ class LinksDAO(BaseDAO):
 
     async def deactivate_link(self, link: Link):
         try:
-            link.is_active = False
-            await self._session.commit()
-            await self._session.refresh(link)
-            log_message = f"Link {link.short_code} deactivated successfully."
-            logger.info(log_message)
-            return link
+            query = (
+                update(self.model)
+                .where(self.model.id == link.id)
+                .values(is_active=False)
+                .returning(self.model)
+            )
+            result = await self._session.execute(query)
+            deactivated = result.scalars().first()
+            logger.info("Link {} deactivated successfully.", link.short_code)
+            return deactivated
         except SQLAlchemyError as e:
             logger.error(f"Error deactivating link {link.short_code}: {e}")
-            await self._session.rollback()
             raise
 
-    async def get_link_stats(self, user_id: int):
-        try:
-            query = select(
+    def _link_stats_query(self, user_id: int, hour_since: datetime, day_since: datetime,
+                          include_archived: bool = False):
+        buckets = LinkClickBucket
+        in_hour = and_(buckets.granularity == "minute", buckets.bucket_start >= hour_since)
+        in_day = and_(buckets.granularity == "hour", buckets.bucket_start >= day_since)
+        query = (
+            select(
                 self.model.short_code,
-                self.model.orig_url,
-                self.model.click_count,
-                self.model.created_at,
-                self.model.expires_at
-            ).where(self.model.owner_id == user_id)
+                self.model.orig_url.label("orig_url"),
+                func.coalesce(func.sum(buckets.clicks).filter(in_hour), 0).label("last_hour_clicks"),
+                func.coalesce(func.sum(buckets.clicks).filter(in_day), 0).label("last_day_clicks"),
+            )
+            .select_from(self.model)
+            .outerjoin(buckets, and_(buckets.link_id == self.model.id, or_(in_hour, in_day)))
+            .where(self.model.owner_id == user_id)
+            .group_by(self.model.id)
+        )
+        if not include_archived:
+            return query
+        # archived links have been dead for longer than any bucket window, so they never have recent clicks
+        archived = select(
+            ArchivedLink.short_code,
+            ArchivedLink.orig_url.label("orig_url"),
+            literal(0).label("last_hour_clicks"),
+            literal(0).label("last_day_clicks"),
+            true().label("archived"),
+        ).where(ArchivedLink.owner_id == user_id)
+        return query.add_columns(false().label("archived")).union_all(archived)
+
+    async def get_link_stats(self, user_id: int, hour_since: datetime, day_since: datetime,
+                             include_archived: bool = False):
+        try:
+            query = self._link_stats_query(user_id, hour_since, day_since, include_archived)
             result = await self._session.execute(query)
-            log_message = f"Retrieving link stats for user ID: {user_id}"
-            logger.info(log_message)
+            logger.debug("Retrieving link stats for user ID: {}", user_id)
             return result.all()
         except SQLAlchemyError as e:
             logger.error(f"Error retrieving link stats for user {user_id}: {e}")
             raise
 
+    async def stream_link_stats(self, user_id: int, hour_since: datetime, day_since: datetime, chunk_size: int,
+                                include_archived: bool = False):
+        # server-side cursor: rows arrive chunk_size at a time instead of all at once
+        query = self._link_stats_query(user_id, hour_since, day_since, include_archived)
+        query = query.execution_options(yield_per=chunk_size)
+        try:
+            result = await self._session.stream(query)
+            logger.debug("Streaming link stats for user ID: {}", user_id)
+            async for partition in result.partitions():
+                yield partition
+        except SQLAlchemyError as e:
+            logger.error(f"Error streaming link stats for user {user_id}: {e}")
+            raise
+
+    async def get_click_series(self, user_id: int, granularity: str, since: datetime):
+        buckets = LinkClickBucket
+        try:
+            query = (
+                select(self.model.short_code, buckets.bucket_start, buckets.clicks)
+                .join(buckets, buckets.link_id == self.model.id)
+                .where(
+                    self.model.owner_id == user_id,
+                    buckets.granularity == granularity,
+                    buckets.bucket_start >= since,
+                )
+                .order_by(buckets.link_id, buckets.bucket_start)
+            )
+            result = await self._session.execute(query)
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving {granularity} click series for user {user_id}: {e}")
+            raise
+
     async def increment_click(self, short_code: str):
         try:
-            link = await self.find_one_or_none_by_field(short_code=short_code)
-            if link:
-                link.click_count += 1
-                await self._session.commit()
-                await self._session.refresh(link)
-                return link
-            return None
+            query = (
+                update(self.model)
+                .where(self.model.short_code == short_code)
+                .values(click_count=self.model.click_count + 1)
+                .returning(self.model)
+            )
+            result = await self._session.execute(query)
+            return result.scalars().first()
         except SQLAlchemyError as e:
             logger.error(f"Error incrementing click for link {short_code}: {e}")
-            await self._session.rollback()
+            raise
+
+    async def redirect(self, short_code: str) -> str | None:
+        table = self.model.__table__
+        urls = Url.__table__
+        query = (
+            update(table)
+            .where(
+                self._short_code_filter(short_code),
+                urls.c.id == table.c.url_id,
+                table.c.is_active.is_(True),
+                table.c.expires_at > datetime.now(),
+            )
+            .values(click_count=table.c.click_count + 1)
+            .returning(urls.c.url)
+        )
+        try:
+            result = await self._session.execute(query)
+            return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            logger.error(f"Error redirecting link {short_code}: {e}")
+            raise
+
+    async def sweep_expired(self, batch_size: int, purge: bool = False) -> list[str]:
+        table = self.model.__table__
+        expired = select(table.c.id).where(table.c.expires_at <= datetime.now())
+        if not purge:
+            expired = expired.where(table.c.is_active.is_(True))
+        expired = expired.limit(batch_size).with_for_update(skip_locked=True)
+        if purge:
+            query = delete(table).where(table.c.id.in_(expired))
+        else:
+            query = update(table).where(table.c.id.in_(expired)).values(is_active=False)
+        query = query.returning(table.c.short_code)
+        try:
+            result = await self._session.execute(query)
+            short_codes = list(result.scalars().all())
+            if short_codes:
+                logger.info("{} {} expired links", "Purged" if purge else "Deactivated", len(short_codes))
+            return short_codes
+        except SQLAlchemyError as e:
+            logger.error(f"Error sweeping expired links: {e}")
+            raise
+
+    async def archive_links(self, dead_before: datetime, batch_size: int) -> list[str]:
+        """Move up to ``batch_size`` links that expired or were deactivated before ``dead_before`` to the archive.
+
+        One statement: the DELETE ... RETURNING feeds the INSERT, so a link is
+        never in both tables or in neither. Rows locked by live traffic are
+        skipped and picked up by a later batch.
+        """
+        table = self.model.__table__
+        archive = ArchivedLink.__table__
+        columns = [column.key for column in table.c]
+        dead = select(table.c.id).where(
+            or_(
+                and_(table.c.is_active.is_(True), table.c.expires_at < dead_before),
+                and_(table.c.is_active.is_(False), or_(table.c.expires_at < dead_before, table.c.updated_at < dead_before)),
+            )
+        ).limit(batch_size).with_for_update(skip_locked=True)
+        moved = delete(table).where(table.c.id.in_(dead)).returning(*table.c).cte("moved")
+        query = (
+            insert(archive)
+            .from_select(columns, select(*[moved.c[key] for key in columns]))
+            .returning(archive.c.short_code)
+        )
+        try:
+            result = await self._session.execute(query)
+            short_codes = list(result.scalars().all())
+            if short_codes:
+                logger.info("Archived {} links", len(short_codes))
+            return short_codes
+        except SQLAlchemyError as e:
+            logger.error(f"Error archiving links: {e}")
+            raise
+
+    async def add_clicks(self, counts: dict[str, int]):
+        if not counts:
+            return
+        table = self.model.__table__
+        query = (
+            update(table)
+            .where(table.c.short_code == bindparam("code"))
+            .values(click_count=table.c.click_count + bindparam("clicks"))
+        )
+        try:
+            # every worker updates the same hot rows; taking their locks in one global order rules out deadlocks
+            params = [{"code": code, "clicks": counts[code]} for code in sorted(counts)]
+            await self._session.execute(query, params)
+            logger.info("Flushed clicks for {} links", len(counts))
+        except SQLAlchemyError as e:
+            logger.error(f"Error flushing clicks for {len(counts)} links: {e}")
+            raise
+
+    async def add_click_buckets(self, rows: list[dict]):
+        if not rows:
+            return
+        buckets = LinkClickBucket.__table__
+        table = self.model.__table__
+        query = insert(buckets).from_select(
+            ["link_id", "granularity", "bucket_start", "clicks"],
+            select(
+                table.c.id,
+                bindparam("granularity", type_=String),
+                bindparam("bucket_start", type_=DateTime),
+                bindparam("clicks", type_=Integer),
+            ).where(table.c.short_code == bindparam("code")),
+        )
+        query = query.on_conflict_do_update(
+            index_elements=["link_id", "granularity", "bucket_start"],
+            set_={"clicks": buckets.c.clicks + query.excluded.clicks},
+        )
+        try:
+            await self._session.execute(query, rows)
+        except SQLAlchemyError as e:
+            logger.error(f"Error writing {len(rows)} click buckets: {e}")
+            raise
+
+    async def prune_click_buckets(self, granularity: str, before: datetime, batch_size: int) -> int:
+        buckets = LinkClickBucket.__table__
+        stale = (
+            select(buckets.c.id)
+            .where(buckets.c.granularity == granularity, buckets.c.bucket_start < before)
+            .limit(batch_size)
+        )
+        try:
+            result = await self._session.execute(delete(buckets).where(buckets.c.id.in_(stale)))
+            return result.rowcount
+        except SQLAlchemyError as e:
+            logger.error(f"Error pruning {granularity} click buckets: {e}")
             raise
 
     async def find_one_or_none_by_field(self, **kwargs):
@@ -113,8 +468,7 @@ class LinksDAO(BaseDAO):
             query = select(self.model).filter_by(**kwargs)
             result = await self._session.execute(query)
             item = result.scalars().first()
-            log_message = f"Finding link by field {kwargs}: {'found' if item else 'not found'}"
-            logger.info(log_message)
+            logger.debug("Finding link by field {}: {}", kwargs, "found" if item else "not found")
             return item
         except SQLAlchemyError as e:
             logger.error(f"Error finding link by field {kwargs}: {e}")
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.background import BackgroundTask
+from app.config import settings
+from app.dao.database import async_session_maker
+from app.links.cache import link_cache
+from app.links.dao import LinksDAO
+
+from loguru import logger
+
+
+class ExpirySweeper(BackgroundTask):
+    """Deactivates (or purges) expired links in bounded batches.
+
+    Every batch runs in its own short transaction and skips rows locked by
+    live traffic, so a large backlog never holds long locks. The same loop
+    prunes click rollup buckets that fell out of their retention window.
+    """
+
+    def __init__(self, interval: float, batch_size: int, purge: bool = False, session_factory=async_session_maker):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.purge = purge
+        self._session_factory = session_factory
+        self.swept = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    async def sweep(self, max_batches: int | None = None) -> int:
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            async with self._session_factory() as session:
+                short_codes = await LinksDAO(session).sweep_expired(self.batch_size, purge=self.purge)
+                await session.commit()
+            for short_code in short_codes:
+                link_cache.invalidate(short_code)
+            total += len(short_codes)
+            batches += 1
+            if len(short_codes) < self.batch_size:
+                break
+            await asyncio.sleep(0)
+        self.swept += total
+        return total
+
+    async def prune_click_buckets(self) -> int:
+        now = datetime.now()
+        cutoffs = (
+            ("minute", now - timedelta(hours=settings.CLICK_MINUTE_BUCKET_RETENTION_HOURS)),
+            ("hour", now - timedelta(days=settings.CLICK_HOUR_BUCKET_RETENTION_DAYS)),
+        )
+        total = 0
+        for granularity, before in cutoffs:
+            while True:
+                async with self._session_factory() as session:
+                    deleted = await LinksDAO(session).prune_click_buckets(granularity, before, self.batch_size)
+                    await session.commit()
+                total += deleted
+                if deleted < self.batch_size:
+                    break
+                await asyncio.sleep(0)
+        return total
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+                await self.prune_click_buckets()
+            except Exception as e:
+                logger.error(f"Expiry sweep failed: {e}")
+
+
+expiry_sweeper = ExpirySweeper(
+    interval=settings.LINK_EXPIRY_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.LINK_EXPIRY_SWEEP_BATCH_SIZE,
+    purge=settings.LINK_EXPIRY_SWEEP_MODE == "purge",
+)
@@ -0,0 +1,59 @@
+import json
+from urllib.parse import quote
+
+from starlette.routing import Match, Route
+
+from app.dao.database import replica_router
+from app.exceptions import LinkNotFoundException
+from app.links.link_service import LinkService
+
+# same quoting as starlette's RedirectResponse
+_LOCATION_SAFE = ":/%#?=@[]!$&'()*+,;"
+_EMPTY_BODY = {"type": "http.response.body", "body": b""}
+_NOT_FOUND_BODY = json.dumps({"detail": LinkNotFoundException.detail}, separators=(",", ":")).encode()
+_NOT_FOUND_START = {
+    "type": "http.response.start",
+    "status": 404,
+    "headers": [(b"content-length", str(len(_NOT_FOUND_BODY)).encode()), (b"content-type", b"application/json")],
+}
+_NOT_FOUND = {"type": "http.response.body", "body": _NOT_FOUND_BODY}
+
+
+def _connect(primary: bool):
+    target = replica_router.primary if primary else replica_router.route()
+    return target.autocommit_engine.connect()
+
+
+class LeanRedirect:
+    """Raw ASGI endpoint for ``GET /{short_code}``.
+
+    Serves the same responses as the public redirect route without dependency
+    injection, an ORM session or a Response object. Resolution is shared with
+    that route through ``LinkService.resolve_redirect``; cache misses here run
+    on an autocommit connection checked out straight from the pool.
+    """
+
+    async def __call__(self, scope, receive, send):
+        orig_url = await LinkService.resolve_redirect(_connect, scope["path_params"]["short_code"])
+        if orig_url is None:
+            await send(_NOT_FOUND_START)
+            await send(_NOT_FOUND)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": 307,
+            "headers": [(b"content-length", b"0"), (b"location", quote(orig_url, safe=_LOCATION_SAFE).encode("latin-1"))],
+        })
+        await send(_EMPTY_BODY)
+
+
+class LeanRedirectRoute(Route):
+    def __init__(self, path: str = "/{short_code}"):
+        super().__init__(path, LeanRedirect(), methods=["GET"], include_in_schema=False)
+
+    def matches(self, scope):
+        match, child_scope = super().matches(scope)
+        if match is not Match.NONE:
+            # access log and metrics label requests by route template, as they do for APIRoute
+            child_scope["route"] = self
+        return match, child_scope
@@ -1,29 +1,70 @@
-from app.exceptions import LinkNotFoundException
+import csv
+import io
+import json
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.dao.database import replica_router
+from app.exceptions import LinkNotFoundException, ShortCodeAllocationException
+from app.invalidation import publish_invalidation
+from app.links.bloom import short_code_filter
+from app.links.cache import link_cache, cache_link, invalidate_link, reload_from_primary
+from app.links.click_buffer import click_buffer
 from app.links.dao import LinksDAO
 from app.links.models import Link
-from app.links.schemas import LinkStats
 
 
 class LinkService:
     @staticmethod
-    async def create_link(session, orig_url: str, owner_id: int) -> Link:
+    async def create_link(session, orig_url: str, owner_id: int):
+        dao = LinksDAO(session)
+        link = await dao.create_link(orig_url=orig_url, owner_id=owner_id, max_attempts=settings.LINK_CODE_MAX_ATTEMPTS,
+                                     dedupe=settings.LINK_DEDUPE)
+        if link is None:
+            raise ShortCodeAllocationException
+        replica_router.mark_write(owner_id)
+        await LinkService._announce_codes(session, [link.short_code])
+        return link
+
+    @staticmethod
+    async def create_links(session, orig_urls: list[str], owner_id: int):
         dao = LinksDAO(session)
-        return await dao.create_link(orig_url=orig_url, owner_id=owner_id)
+        created = await dao.create_links(orig_urls, owner_id=owner_id, max_attempts=settings.LINK_CODE_MAX_ATTEMPTS,
+                                         dedupe=settings.LINK_DEDUPE)
+        if any(row is None for row in created):
+            raise ShortCodeAllocationException
+        replica_router.mark_write(owner_id)
+        await LinkService._announce_codes(session, [link.short_code for link in created])
+        return created
+
+    @staticmethod
+    async def _announce_codes(session, short_codes: list[str]):
+        if not settings.LINK_BLOOM_ENABLED:
+            return
+        for short_code in short_codes:
+            short_code_filter.add(short_code)
+        await publish_invalidation(session, "code", *short_codes)
 
     @staticmethod
     async def get_link_by_code(session, short_code: str):
         dao = LinksDAO(session)
-        return await dao.find_one_or_none_by_field(short_code=short_code)
+        return await dao.get_by_short_code(short_code)
 
     @staticmethod
-    async def list_links(session, owner_id: int, is_active=None, skip=0, limit=10):
+    async def list_links(session, owner_id: int, is_active=None, skip=0, limit=10, cursor=None):
         dao = LinksDAO(session)
-        return await dao.get_links_for_user(owner_id=owner_id, is_active=is_active, skip=skip, limit=limit)
+        return await dao.get_links_for_user(owner_id=owner_id, is_active=is_active, skip=skip, limit=limit,
+                                            cursor=cursor)
 
     @staticmethod
     async def deactivate_link(session, link: Link):
         dao = LinksDAO(session)
-        return await dao.deactivate_link(link)
+        deactivated = await dao.deactivate_link(link)
+        invalidate_link(deactivated.short_code)
+        await publish_invalidation(session, "link", deactivated.short_code)
+        replica_router.mark_write(deactivated.owner_id)
+        return deactivated
 
     @staticmethod
     async def increment_click(session, short_code: str):
@@ -31,23 +72,115 @@ class LinkService:
         return await dao.increment_click(short_code)
 
     @staticmethod
-    async def get_link_stats(session, owner_id: int):
+    def _stats_windows() -> tuple[datetime, datetime]:
+        now = datetime.now()
+        hour_since = now - timedelta(hours=1)
+        # the current partial hour plus the 23 full hours before it
+        day_since = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=23)
+        return hour_since, day_since
+
+    @staticmethod
+    async def get_link_stats(session, owner_id: int, granularity: str | None = None, include_archived: bool = False):
         dao = LinksDAO(session)
-        raw_stats = await dao.get_link_stats(owner_id)
+        hour_since, day_since = LinkService._stats_windows()
+        raw_stats = await dao.get_link_stats(owner_id, hour_since=hour_since, day_since=day_since,
+                                             include_archived=include_archived)
+        series = None
+        if granularity is not None:
+            series = {}
+            since = hour_since if granularity == "minute" else day_since
+            for row in await dao.get_click_series(owner_id, granularity, since):
+                series.setdefault(row.short_code, []).append({"bucket_start": row.bucket_start, "clicks": row.clicks})
+        # plain dicts shaped like LinkStats with None fields left out; the route serializes them as they are
         stats = []
         for row in raw_stats:
-            stats.append(LinkStats(
-                link=row[0],
-                orig_link=row[1],
-                last_hour_clicks=row[2] if len(row) > 2 else 0,
-                last_day_clicks=row[2] if len(row) > 2 else 0,
-            ))
+            entry = {
+                "link": row.short_code,
+                "orig_link": row.orig_url,
+                "last_hour_clicks": row.last_hour_clicks,
+                "last_day_clicks": row.last_day_clicks,
+            }
+            archived = include_archived and row.archived
+            if series is not None:
+                # an archived code may since have been issued again, so its buckets are not its own
+                entry["series"] = [] if archived else series.get(row.short_code, [])
+            if include_archived:
+                entry["archived"] = row.archived
+            stats.append(entry)
         return stats
 
     @staticmethod
-    async def redirect_link(session, short_code: str):
-        link = await LinkService.get_link_by_code(session, short_code)
-        if not link or not link.is_active:
+    async def stream_link_stats(session_factory, owner_id: int, export_format: str, include_archived: bool = False):
+        # runs after the request dependencies are closed, so it owns its session
+        hour_since, day_since = LinkService._stats_windows()
+        columns = ("link", "orig_link", "last_hour_clicks", "last_day_clicks")
+        if include_archived:
+            columns += ("archived",)
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+        async with session_factory() as session:
+            dao = LinksDAO(session)
+            async for rows in dao.stream_link_stats(owner_id, hour_since, day_since, settings.STATS_STREAM_CHUNK_SIZE,
+                                                    include_archived):
+                if export_format == "csv":
+                    buffer.seek(0)
+                    buffer.truncate()
+                    writer.writerows(rows)
+                    yield buffer.getvalue()
+                else:
+                    yield "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+    @staticmethod
+    async def resolve_redirect(connect, short_code: str) -> str | None:
+        """Resolve ``short_code`` and count the click; None means 404.
+
+        Shared by the FastAPI redirect route and the lean ASGI one, which only
+        differ in how they reach the database: ``connect(primary)`` returns an
+        async context manager yielding a session or connection, entered only
+        when the cache cannot answer. Codes invalidated moments ago are
+        reloaded from the primary, so a lagging replica cannot re-cache them,
+        and a code a replica does not know yet is looked up there again.
+        """
+        if settings.REDIRECT_MODE == "atomic":
+            if not short_code_filter.might_contain(short_code):
+                return None
+            async with connect(True) as connection:
+                orig_url = await LinksDAO(connection).redirect(short_code)
+            if orig_url is not None:
+                click_buffer.add(short_code, counted=True)
+            return orig_url
+        link = link_cache.get(short_code)
+        if link is None:
+            if not short_code_filter.might_contain(short_code):
+                return None
+            primary = reload_from_primary(short_code)
+            async with connect(primary) as connection:
+                row = await LinksDAO(connection).resolve(short_code)
+            if row is None and not primary and replica_router.replicas:
+                # most likely created moments ago and not replayed on this replica yet;
+                # the short code filter has already turned away scans for codes that never existed
+                async with connect(True) as connection:
+                    row = await LinksDAO(connection).resolve(short_code)
+            if row is None:
+                return None
+            link = cache_link(row)
+        if not link.is_active or link.expires_at <= datetime.now():
+            return None
+        click_buffer.add(short_code)
+        return link.orig_url
+
+    @staticmethod
+    async def redirect_link(session, short_code: str) -> str:
+        def connect(primary: bool):
+            # the route's dependency picked the database for the redirect mode; a just-invalidated code needs the primary
+            if primary and settings.REDIRECT_MODE == "cached":
+                return replica_router.primary.autocommit_session_maker()
+            return nullcontext(session)
+
+        orig_url = await LinkService.resolve_redirect(connect, short_code)
+        if orig_url is None:
             raise LinkNotFoundException
-        await LinkService.increment_click(session, short_code)
-        return link
+        return orig_url
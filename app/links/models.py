@@ -1,17 +1,69 @@
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, column_property
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, LargeBinary, select, text, func
 
 from datetime import datetime
 
 from app.dao.database import Base
 
+class Url(Base):
+    # every distinct URL is stored once; links point at it by id
+    url_hash: Mapped[bytes] = mapped_column(LargeBinary(32), unique=True, nullable=False)
+    url: Mapped[str] = mapped_column(String, nullable=False)
+
+
 class Link(Base):
+    __table_args__ = (
+        Index("links_is_active_expires_at_idx", "is_active", "expires_at"),
+        Index("links_owner_id_created_at_id_idx", "owner_id", "created_at", "id"),
+        Index("links_owner_id_is_active_created_at_id_idx", "owner_id", "is_active", "created_at", "id"),
+        Index("links_owner_id_url_id_idx", "owner_id", "url_id", postgresql_where=text("is_active")),
+        # finds links deactivated long enough ago to archive
+        Index("links_inactive_updated_at_idx", "updated_at", postgresql_where=text("is_active IS false")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     short_code: Mapped[str] = mapped_column(String(16), unique=True, index=True, nullable=False)
-    orig_url: Mapped[str] = mapped_column(String, nullable=False)
+    url_id: Mapped[int] = mapped_column(ForeignKey("urls.id"), nullable=False)
+    orig_url: Mapped[str] = column_property(
+        select(Url.url).where(Url.id == url_id).correlate_except(Url).scalar_subquery()
+    )
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
     expires_at: Mapped[datetime] = mapped_column(DateTime)
     click_count: Mapped[int] = mapped_column(Integer, default=0)
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
\ No newline at end of file
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+
+
+class ArchivedLink(Base):
+    """Links moved out of ``links`` once they have been dead for the retention window."""
+    __tablename__ = "links_archive"
+    __table_args__ = (
+        Index("links_archive_owner_id_idx", "owner_id"),
+    )
+
+    # keeps the id the link had in ``links``
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    short_code: Mapped[str] = mapped_column(String(16), nullable=False)
+    url_id: Mapped[int] = mapped_column(ForeignKey("urls.id"), nullable=False)
+    orig_url: Mapped[str] = column_property(
+        select(Url.url).where(Url.id == url_id).correlate_except(Url).scalar_subquery()
+    )
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+    click_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+
+
+class LinkClickBucket(Base):
+    __tablename__ = "link_click_buckets"
+    __table_args__ = (
+        UniqueConstraint("link_id", "granularity", "bucket_start"),
+        Index("link_click_buckets_granularity_bucket_start_idx", "granularity", "bucket_start"),
+    )
+
+    link_id: Mapped[int] = mapped_column(ForeignKey("links.id", ondelete="CASCADE"), nullable=False)
+    granularity: Mapped[str] = mapped_column(String(8), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    clicks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,42 +1,78 @@
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import RedirectResponse
+from typing import Annotated, Literal
 
+from fastapi import APIRouter, Body, Depends, Query, status
+from fastapi.responses import ORJSONResponse, RedirectResponse, StreamingResponse
+
+from app.config import settings
 from app.links.schemas import LinkCreate, LinkRead, LinkStats
 from app.links.link_service import LinkService
-from app.dependencies.links_dependency import get_owned_link, get_pagination_params
-from app.dependencies.dao_dependency import get_session_with_commit
+from app.links.utils import encode_cursor
+from app.dependencies.links_dependency import get_owned_link, get_pagination_params, get_cursor_param, get_user_read_session
+from app.dao.database import replica_router
+from app.dependencies.dao_dependency import get_session_with_commit, get_read_session
 from app.dependencies.auth_dependency import get_current_user
+from app.rate_limit import RateLimit
+from app.serialization import trusted_rows
 
 from loguru import logger
 
 public_router = APIRouter()
 private_router = APIRouter(tags=["private"])
 
+# the atomic redirect bumps the click counter in place, so it has to run on the primary
+get_redirect_session = get_session_with_commit if settings.REDIRECT_MODE == "atomic" else get_read_session
+
 
 @private_router.post("/create",
                      response_model=LinkRead,
                      status_code=status.HTTP_201_CREATED,
                      summary="Create a short link",
-                     description="Creates a short link for the provided original URL. The link will be active for 24 hours by default.",
+                     description="Creates a short link for the provided original URL. The link will be active for 24 hours by default. With link deduplication enabled, the user's active link for the same URL is returned instead of a new one.",
                      responses={
                          201: {"description": "Short link created successfully"},
                          400: {"description": "Invalid URL or other validation errors"},
-                     })
+                         429: {"description": "Too many requests from this client"},
+                     },
+                     dependencies=[Depends(RateLimit("links.create"))])
 async def create_short_link(
         link: LinkCreate,
         session=Depends(get_session_with_commit),
         current_user=Depends(get_current_user)
 ):
-    logger.info(f"Creating short link for user {current_user.id} with URL: {link.orig_url}")
     link = await LinkService.create_link(session, link.orig_url, current_user.id)
-    logger.info(f"Short link created: {link.short_code} for user {current_user.id}")
+    logger.info("Short link created: {} for user {}", link.short_code, current_user.id)
     return link
 
 
+@private_router.post("/bulk",
+                     response_model=list[LinkRead],
+                     response_class=ORJSONResponse,
+                     status_code=status.HTTP_201_CREATED,
+                     summary="Create short links in bulk",
+                     description=f"Creates short links for up to {settings.LINK_BULK_MAX_ITEMS} URLs in one request. Links are returned in the order of the submitted URLs.",
+                     responses={
+                         201: {"description": "Short links created successfully"},
+                         422: {"description": "Invalid URL or too many items"},
+                         429: {"description": "Too many requests from this client"},
+                         503: {"description": "Could not allocate unique short codes"},
+                     },
+                     dependencies=[Depends(RateLimit("links.bulk"))])
+async def create_short_links_bulk(
+        links: Annotated[list[LinkCreate], Body(min_length=1, max_length=settings.LINK_BULK_MAX_ITEMS)],
+        session=Depends(get_session_with_commit),
+        current_user=Depends(get_current_user)
+) -> ORJSONResponse:
+    created = await LinkService.create_links(session, [link.orig_url for link in links], current_user.id)
+    logger.info("{} short links created for user {}", len(created), current_user.id)
+    # rows straight from the INSERT; skip response_model validation
+    return ORJSONResponse(trusted_rows(LinkRead, created), status_code=status.HTTP_201_CREATED)
+
+
 @private_router.get("/list",
                     response_model=list[LinkRead],
+                    response_class=ORJSONResponse,
                     summary="Liст all links for the user",
-                    description="Retrieves a list of all short links created by the user. You can filter by active status and paginate results.",
+                    description="Retrieves the user's short links, newest first. You can filter by active status and paginate results either with skip/limit or, for deep pages, with the cursor returned in the X-Next-Cursor header.",
                     responses={
                         200: {"description": "List of links retrieved successfully"},
                         404: {"description": "No links found for the user"},
@@ -44,17 +80,19 @@ async def create_short_link(
                     }
                     )
 async def list_links(
-        session=Depends(get_session_with_commit),
+        session=Depends(get_user_read_session),
         current_user=Depends(get_current_user),
         pagination: tuple[int, int] = Depends(get_pagination_params),
+        cursor=Depends(get_cursor_param),
         is_active: bool | None = None,
-) -> list[LinkRead]:
+) -> ORJSONResponse:
     skip, limit = pagination
-    logger.info(
-        f"Listing links for user {current_user.id} with active status: {is_active}, skip: {skip}, limit: {limit}")
-    user_list_links = await LinkService.list_links(session, current_user.id, is_active, skip, limit)
-    logger.info(f"Links listed for user {current_user.id}: {len(user_list_links)} links found")
-    return user_list_links
+    user_list_links = await LinkService.list_links(session, current_user.id, is_active, skip, limit, cursor)
+    headers = None
+    if len(user_list_links) == limit:
+        last = user_list_links[-1]
+        headers = {"X-Next-Cursor": encode_cursor(last.created_at, last.id)}
+    return ORJSONResponse(trusted_rows(LinkRead, user_list_links), headers=headers)
 
 
 @private_router.post("/{short_code}/deactivate",
@@ -70,28 +108,52 @@ async def deactivate_short_link(
         session=Depends(get_session_with_commit),
         current_user=Depends(get_current_user)
 ) -> LinkRead:
-    logger.info(f"Deactivating link {link.short_code} for user {current_user.id}")
     deactivating = await LinkService.deactivate_link(session, link)
-    logger.info(f"Link {link.short_code} deactivated for user {current_user.id}")
+    logger.info("Link {} deactivated for user {}", link.short_code, current_user.id)
     return deactivating
 
 
 @private_router.get("/stats",
                     response_model=list[LinkStats],
+                    response_class=ORJSONResponse,
                     summary="Get link statistics",
-                    description="Retrieves statistics for all links created by the user, including click counts and creation dates.",
+                    description="Retrieves statistics for all links created by the user: clicks over the last hour and the last day. Pass granularity=minute (last hour) or granularity=hour (last day) to also get a per-bucket time series, and include_archived=true to also list links that were moved to the archive.",
                     responses={
                         200: {"description": "Link statistics retrieved successfully"},
                         404: {"description": "No links found for the user"}
                     })
 async def stats(
-        session=Depends(get_session_with_commit),
-        current_user=Depends(get_current_user)
-) -> list[LinkStats]:
-    logger.info(f"Retrieving link statistics for user {current_user.id}")
-    links_stats = await LinkService.get_link_stats(session, current_user.id)
-    logger.info(f"Link statistics retrieved for user {current_user.id}")
-    return links_stats
+        session=Depends(get_user_read_session),
+        current_user=Depends(get_current_user),
+        granularity: Literal["minute", "hour"] | None = None,
+        include_archived: bool = False,
+) -> ORJSONResponse:
+    links_stats = await LinkService.get_link_stats(session, current_user.id, granularity, include_archived)
+    return ORJSONResponse(links_stats)
+
+
+@private_router.get("/stats/export",
+                    response_class=StreamingResponse,
+                    summary="Export link statistics",
+                    description="Streams statistics for all links created by the user as NDJSON (default) or CSV. Rows are read through a server-side cursor, so memory use does not grow with the number of links. Pass include_archived=true to add archived links, flagged in an extra archived column.",
+                    responses={
+                        200: {
+                            "description": "Link statistics stream",
+                            "content": {"application/x-ndjson": {}, "text/csv": {}},
+                        },
+                    })
+async def export_stats(
+        current_user=Depends(get_current_user),
+        export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+        include_archived: bool = False,
+) -> StreamingResponse:
+    logger.info("Exporting link statistics for user {} as {}", current_user.id, export_format)
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        LinkService.stream_link_stats(replica_router.session_maker(current_user.id, autocommit=False), current_user.id,
+                                      export_format, include_archived),
+        media_type=media_type,
+    )
 
 
 @public_router.get("/{short_code}",
@@ -104,9 +166,7 @@ async def stats(
                    )
 async def redirect_link(
         short_code: str,
-        session=Depends(get_session_with_commit),
+        session=Depends(get_redirect_session),
 ) -> RedirectResponse:
-    logger.info(f"Redirecting short code: {short_code}")
-    link = await LinkService.redirect_link(session, short_code)
-    logger.info(f"Link found: {link.short_code} with original URL: {link.orig_url}, incrementing click count")
-    return RedirectResponse(url=link.orig_url)
+    orig_url = await LinkService.redirect_link(session, short_code)
+    return RedirectResponse(url=orig_url)
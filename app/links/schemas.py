@@ -29,8 +29,15 @@ class LinkRead(LinkBase):
                                  }
                              })
 
+class ClickBucket(BaseModel):
+    bucket_start: datetime
+    clicks: int
+
 class LinkStats(BaseModel):
     link: str
     orig_link: str
     last_hour_clicks: int
-    last_day_clicks: int
\ No newline at end of file
+    last_day_clicks: int
+    series: list[ClickBucket] | None = None
+    # only set when archived links were requested
+    archived: bool | None = None
\ No newline at end of file
@@ -1,8 +1,73 @@
+import base64
+import hashlib
 import random
 import string
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
 
 from loguru import logger
 
+BASE62_ALPHABET = string.digits + string.ascii_letters
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
 def generate_short_code(length: int = 8) -> str:
-    logger.debug(f"Generating short code of length {length}")
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length)) 
\ No newline at end of file
+    logger.debug("Generating short code of length {}", length)
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+
+
+def encode_base62(number: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        number, remainder = divmod(number, 62)
+        chars.append(BASE62_ALPHABET[remainder])
+    if number:
+        raise ValueError(f"Number does not fit into {length} base62 digits")
+    return ''.join(reversed(chars))
+
+
+def decode_base62(code: str) -> int:
+    number = 0
+    for char in code:
+        index = BASE62_ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"Invalid base62 character: {char!r}")
+        number = number * 62 + index
+    return number
+
+
+def encode_cursor(created_at: datetime, link_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{link_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, link_id = raw.split("|")
+        created_at, link_id = datetime.fromisoformat(created_at), int(link_id)
+        # created_at is a naive column; an aware value can't be compared with it
+        if created_at.tzinfo is not None:
+            raise ValueError("Cursor timestamp must not carry a timezone")
+        return created_at, link_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def normalize_url(url: str) -> str:
+    # only rewrites parts that never change what the URL points to:
+    # scheme and host case, a default port and an empty path
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    userinfo, at, host = parts.netloc.rpartition("@")
+    port = ""
+    if host.rfind(":") > host.rfind("]"):
+        host, _, port = host.rpartition(":")
+    if port == DEFAULT_PORTS.get(scheme):
+        port = ""
+    netloc = f"{userinfo}{at}{host.lower()}{':' + port if port else ''}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, parts.fragment))
+
+
+def url_digest(url: str) -> bytes:
+    return hashlib.sha256(url.encode()).digest()
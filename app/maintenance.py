@@ -0,0 +1,67 @@
+"""Maintenance commands for the links table, run against DB_URL:
+
+    python -m app.maintenance archive [--retention-days 30] [--batch-size 1000] [--max-batches N] [--pause 0.1]
+    python -m app.maintenance reindex
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.dao.database import async_session_maker, engine
+from app.links.dao import LinksDAO
+
+from loguru import logger
+
+
+async def archive_links(retention_days: int, batch_size: int, max_batches: int | None = None, pause: float = 0.0,
+                        session_factory=async_session_maker) -> int:
+    """Move dead links to ``links_archive`` one short transaction per batch; return how many moved."""
+    dead_before = datetime.now() - timedelta(days=retention_days)
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        async with session_factory() as session:
+            short_codes = await LinksDAO(session).archive_links(dead_before, batch_size)
+            await session.commit()
+        total += len(short_codes)
+        batches += 1
+        if len(short_codes) < batch_size:
+            break
+        # leave room for live traffic and replication between batches
+        await asyncio.sleep(pause)
+    logger.info("Archived {} links dead since before {}", total, dead_before)
+    return total
+
+
+async def reindex_links() -> None:
+    # deleted rows leave index pages half empty until the indexes are rebuilt;
+    # CONCURRENTLY cannot run inside a transaction block
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text("REINDEX TABLE CONCURRENTLY links"))
+    logger.info("Rebuilt the indexes of links")
+
+
+async def main(args) -> None:
+    try:
+        if args.command == "archive":
+            await archive_links(args.retention_days, args.batch_size, args.max_batches, args.pause)
+        elif args.command == "reindex":
+            await reindex_links()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive = commands.add_parser("archive", help="move links dead for longer than the retention window to links_archive")
+    archive.add_argument("--retention-days", type=int, default=settings.LINK_ARCHIVE_RETENTION_DAYS)
+    archive.add_argument("--batch-size", type=int, default=settings.LINK_ARCHIVE_BATCH_SIZE)
+    archive.add_argument("--max-batches", type=int, default=None)
+    archive.add_argument("--pause", type=float, default=0.1, help="seconds to wait between batches")
+    commands.add_parser("reindex", help="rebuild the links indexes without blocking writes")
+    asyncio.run(main(parser.parse_args()))
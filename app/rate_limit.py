@@ -0,0 +1,92 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Protocol
+
+from fastapi import Request
+
+from app.auth.token_service import TokenService
+from app.config import settings
+from app.exceptions import RateLimitExceededException
+from app.metrics import registry
+
+rate_limited_requests = registry.counter(
+    "rate_limited_requests_total", "Requests rejected with 429 by rate limit name.", ("limit",))
+
+
+class RateLimitBackend(Protocol):
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take one token from ``key``'s bucket; return 0 if allowed, else seconds until a token is available."""
+
+
+class InMemoryTokenBuckets:
+    """Token buckets for one process, kept in LRU order.
+
+    A bucket that has been idle long enough to refill completely carries no
+    state, so it is dropped; ``max_keys`` bounds memory under a flood of
+    distinct clients. Each bucket is a (tokens, last_update) pair.
+    """
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        # refill time of the slowest bucket seen; anything idle this long is full again
+        self._idle_ttl = 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            _, last = next(iter(buckets.values()))
+            if now - last < self._idle_ttl and len(buckets) <= self.max_keys:
+                break
+            buckets.popitem(last=False)
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = self._clock()
+        self._idle_ttl = max(self._idle_ttl, burst / rate)
+        tokens, last = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._evict(now)
+        return retry_after
+
+
+def client_key(request: Request) -> str:
+    # authenticated callers are limited per user, everyone else per address
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        payload = TokenService.decode_token(authorization[7:])
+        if payload and "sub" in payload:
+            return f"user:{payload['sub']}"
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}"
+
+
+class RateLimit:
+    """Route dependency enforcing ``settings.RATE_LIMITS[name]`` requests per minute.
+
+    Use it in the route decorator's ``dependencies`` so it runs before the
+    session, authentication and body-dependent work.
+    """
+
+    backend: RateLimitBackend = InMemoryTokenBuckets(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def __call__(self, request: Request) -> None:
+        per_minute = settings.RATE_LIMITS.get(self.name)
+        if not settings.RATE_LIMIT_ENABLED or not per_minute:
+            return
+        retry_after = await self.backend.acquire(f"{self.name}:{client_key(request)}", per_minute / 60, per_minute)
+        if retry_after > 0:
+            rate_limited_requests.inc(self.name)
+            raise RateLimitExceededException(retry_after)
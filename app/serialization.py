@@ -0,0 +1,23 @@
+from functools import lru_cache
+from operator import attrgetter
+from typing import Iterable
+
+from pydantic import BaseModel
+
+
+@lru_cache(maxsize=None)
+def _fields(model: type[BaseModel]) -> tuple[tuple[str, ...], attrgetter]:
+    names = tuple(model.model_fields)
+    # a single-name attrgetter returns the bare value, so always ask for a tuple
+    return names, attrgetter(*names, *names[:1]) if len(names) == 1 else attrgetter(*names)
+
+
+def trusted_rows(model: type[BaseModel], rows: Iterable) -> list[dict]:
+    """Read ``model``'s fields off each row into plain dicts, without validation.
+
+    Only for rows this service wrote itself: their values were validated on
+    the way in, and re-validating them (URL parsing above all) costs more
+    than rendering the JSON. Pair with ``ORJSONResponse``.
+    """
+    names, getter = _fields(model)
+    return [dict(zip(names, getter(row))) for row in rows]
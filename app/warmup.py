@@ -0,0 +1,81 @@
+import asyncio
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.auth.dao import UsersDAO
+from app.config import settings
+from app.invalidation import publish_invalidation
+from app.links.cache import cache_link
+from app.links.code_allocator import get_code_allocator
+from app.links.dao import LinksDAO
+
+from loguru import logger
+
+
+async def prepare_hot_statements(connection, short_code: str, primary: bool) -> None:
+    """Run the statements behind redirects and authentication once on ``connection``.
+
+    asyncpg prepares statements per connection, keyed by their SQL, so the
+    first request on a cold connection pays for parsing and planning. Runs
+    inside a transaction that is rolled back: the atomic redirect UPDATE
+    and the NOTIFY leave nothing behind.
+    """
+    transaction = await connection.begin()
+    try:
+        dao = LinksDAO(connection)
+        await dao.resolve(short_code)
+        if primary:
+            await dao.redirect(short_code)
+            await UsersDAO(connection).find_one_or_none(filters={"id": 0})
+            await publish_invalidation(connection, "code")
+    finally:
+        await transaction.rollback()
+
+
+async def warm_pool(engine, connections: int, primary: bool) -> int:
+    # hold every connection at once, otherwise the pool hands back the same one each time
+    connections = min(connections, engine.pool.size())
+    short_code = get_code_allocator().sample_code()
+    async with AsyncExitStack() as stack:
+        opened = await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(connections)))
+        await asyncio.gather(*(prepare_hot_statements(connection, short_code, primary) for connection in opened))
+    return len(opened)
+
+
+async def preload_link_cache(session_factory, limit: int) -> int:
+    since = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    async with session_factory() as session:
+        rows = await LinksDAO(session).get_hot_links(since, limit)
+    for row in rows:
+        cache_link(row)
+    return len(rows)
+
+
+async def warm_up(engines, session_factory, listener) -> None:
+    """Open and prime pool connections, then fill the link cache, before the worker takes traffic.
+
+    ``engines`` is a list of (engine, is_primary) pairs. A database that is
+    unreachable only logs a warning: the worker starts cold rather than not
+    at all. The preload waits for ``listener`` so that no invalidation can
+    slip in between loading an entry and subscribing to its changes.
+    """
+    for engine, primary in engines:
+        try:
+            opened = await warm_pool(engine, settings.DB_POOL_WARMUP_CONNECTIONS, primary)
+            logger.info("Warmed {} connections to {}", opened, engine.url.render_as_string(hide_password=True))
+        except (OSError, SQLAlchemyError) as e:
+            logger.warning("Connection pool warm-up failed: {}", e)
+    if settings.CACHE_PRELOAD_LINKS <= 0:
+        return
+    try:
+        await asyncio.wait_for(listener.connected.wait(), timeout=settings.CACHE_PRELOAD_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Cache invalidation listener not connected; skipping link cache preload")
+        return
+    try:
+        loaded = await preload_link_cache(session_factory, settings.CACHE_PRELOAD_LINKS)
+        logger.info("Preloaded {} links into the link cache", loaded)
+    except (OSError, SQLAlchemyError) as e:
+        logger.warning("Link cache preload failed: {}", e)
@@ -0,0 +1,153 @@
+"""Seeding, timing and reporting shared by the benchmark scripts.
+
+Every script reports the same JSON shape, ``{"meta": ..., "scenarios": ...}``
+with p50/p95/p99 latencies and throughput per scenario, and accepts
+--output, --baseline and --max-regression, so any run can be checked
+against an earlier one.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.auth.dao import UsersDAO
+from app.auth.token_service import TokenService
+from app.config import settings
+from app.dao.database import async_session_maker
+from app.links.dao import LinksDAO
+
+# throughput may drop and latency may grow by this fraction before a run counts as a regression
+DEFAULT_MAX_REGRESSION = 0.10
+
+
+async def seed(users: int, links_per_user: int) -> list[dict]:
+    """Create benchmark users with links; return each one's auth headers and short codes."""
+    seeded = []
+    async with async_session_maker() as session:
+        for _ in range(users):
+            user = await UsersDAO(session).add({"username": f"bench_{uuid.uuid4().hex[:12]}", "password_hash": "-"})
+            created = await LinksDAO(session).create_links(
+                [f"https://bench.example/{user.id}/{i}" for i in range(links_per_user)], user.id
+            )
+            seeded.append({
+                "headers": {"Authorization": f"Bearer {TokenService.create_access_token({'sub': str(user.id)})}"},
+                "codes": [link.short_code for link in created],
+            })
+        await session.commit()
+    return seeded
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(timings: list[float], elapsed: float, **extra) -> dict:
+    timings = sorted(timings)
+    return {
+        "requests": len(timings),
+        **extra,
+        "throughput_rps": len(timings) / elapsed,
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": percentile(timings, 0.50),
+        "p95_ms": percentile(timings, 0.95),
+        "p99_ms": percentile(timings, 0.99),
+    }
+
+
+async def measure(call, requests: int) -> dict:
+    """Time ``requests`` sequential awaits of ``call()``."""
+    timings = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings, time.perf_counter() - started)
+
+
+async def asgi_request(app, method: str, path: str) -> tuple[int, bytes]:
+    """Call ``app`` straight through the ASGI interface: server-side time only, no client or sockets."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    status = 0
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(body)
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    regressions = []
+    for scenario, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if current[metric] > previous[metric] * (1 + max_regression):
+                regressions.append(f"{scenario} {metric}: {previous[metric]:.2f} -> {current[metric]:.2f}")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression):
+            regressions.append(
+                f"{scenario} throughput_rps: {previous['throughput_rps']:.1f} -> {current['throughput_rps']:.1f}"
+            )
+    return regressions
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def add_report_arguments(parser) -> None:
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION)
+
+
+def report(args, scenarios: dict, **meta) -> int:
+    """Print and optionally save the results; with --baseline, return 1 if any scenario regressed."""
+    results = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "redirect_mode": settings.REDIRECT_MODE,
+            **meta,
+        },
+        "scenarios": scenarios,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
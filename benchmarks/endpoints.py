@@ -0,0 +1,102 @@
+"""Load test for the redirect, create, list and stats endpoints.
+
+Seeds a migrated database reachable through DB_URL with benchmark users and
+links, then drives the app either in-process through httpx's ASGITransport
+(default) or over HTTP against a running server:
+
+    python benchmarks/endpoints.py --users 10 --links-per-user 200 --requests 2000 --output run.json
+    uvicorn main:app --port 8000 &
+    python benchmarks/endpoints.py --base-url http://127.0.0.1:8000 --output run.json
+
+The server has to share DB_URL and JWT_SECRET with this script so the seeded
+users exist and their tokens are accepted. Pass --baseline with a previous
+run's JSON to fail (exit code 1) when any scenario got slower by more than
+--max-regression.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from httpx import AsyncClient, ASGITransport
+
+from app.dao.database import engine
+from benchmarks.common import add_report_arguments, report, seed, summarize
+
+from loguru import logger
+
+SCENARIOS = ("redirect", "create", "list", "stats")
+
+
+def request_for(scenario: str, seeded: list[dict]) -> tuple[str, str, dict]:
+    user = random.choice(seeded)
+    if scenario == "redirect":
+        return "GET", f"/{random.choice(user['codes'])}", {}
+    if scenario == "create":
+        return "POST", "/api/links/create", {
+            "headers": user["headers"], "json": {"orig_url": f"https://bench.example/new/{uuid.uuid4().hex}"},
+        }
+    if scenario == "list":
+        return "GET", "/api/links/list", {"headers": user["headers"], "params": {"limit": 50}}
+    return "GET", "/api/links/stats", {"headers": user["headers"]}
+
+
+async def run_scenario(client: AsyncClient, scenario: str, seeded: list[dict], requests: int, concurrency: int) -> dict:
+    timings = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            method, url, kwargs = request_for(scenario, seeded)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(timings, time.perf_counter() - started, errors=errors)
+
+
+async def main(args) -> int:
+    logger.remove()
+    seeded = await seed(args.users, args.links_per_user)
+    if args.base_url:
+        client = AsyncClient(base_url=args.base_url)
+        lifespan = nullcontext()
+    else:
+        from main import app
+        # the app reconfigures logging on import; keep benchmark output clean
+        logger.remove()
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+        lifespan = app.router.lifespan_context(app)
+    scenarios = {}
+    async with lifespan, client:
+        for scenario in args.scenarios:
+            await run_scenario(client, scenario, seeded, args.warmup, args.concurrency)
+            scenarios[scenario] = await run_scenario(client, scenario, seeded, args.requests, args.concurrency)
+    await engine.dispose()
+    return report(args, scenarios, transport=args.base_url or "asgi", users=args.users,
+                  links_per_user=args.links_per_user, concurrency=args.concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--links-per-user", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    add_report_arguments(parser)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,68 @@
+"""Compare the FastAPI redirect endpoint with the raw ASGI lean redirect route.
+
+Both apps are called directly through the ASGI interface, so the numbers
+are server-side time only: no HTTP client, no sockets. Needs a migrated
+database reachable through DB_URL:
+
+    python benchmarks/lean_redirect.py --links 1000 --requests 20000 [--output run.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+
+from app.dao.database import engine
+from app.links.cache import link_cache
+from app.links.click_buffer import click_buffer
+from app.links.lean_redirect import LeanRedirectRoute
+from app.links.routes import public_router
+from benchmarks.common import add_report_arguments, asgi_request, measure, report, seed
+
+from loguru import logger
+
+
+def build_apps() -> dict[str, FastAPI]:
+    fastapi_app = FastAPI()
+    fastapi_app.include_router(public_router)
+    lean_app = FastAPI()
+    lean_app.router.routes.append(LeanRedirectRoute())
+    return {"fastapi": fastapi_app, "lean": lean_app}
+
+
+def redirect_call(app, codes: list[str], cold: bool):
+    async def call():
+        if cold:
+            link_cache.clear()
+        status, _ = await asgi_request(app, "GET", f"/{random.choice(codes)}")
+        assert status == 307, status
+    return call
+
+
+async def main(args) -> int:
+    logger.remove()
+    [seeded] = await seed(1, args.links)
+    apps = build_apps()
+    click_buffer.start()
+    scenarios = {}
+    for cache_state, cold in (("cache_hit", False), ("cache_miss", True)):
+        requests = args.requests if not cold else max(args.requests // 10, 1)
+        for name, app in apps.items():
+            call = redirect_call(app, seeded["codes"], cold)
+            await measure(call, min(requests, 200))
+            scenarios[f"{name}_{cache_state}"] = await measure(call, requests)
+    await click_buffer.stop()
+    await engine.dispose()
+    return report(args, scenarios, links=args.links)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    add_report_arguments(parser)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,60 @@
+"""Compare the legacy ORM redirect path with the single-statement redirect.
+
+Needs a migrated database reachable through DB_URL:
+
+    python benchmarks/redirect_modes.py --links 1000 --requests 5000 [--output run.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.dao.database import async_session_maker, engine
+from app.links.dao import LinksDAO
+from benchmarks.common import add_report_arguments, measure, report, seed
+
+from loguru import logger
+
+
+async def legacy_redirect(short_code: str) -> str | None:
+    # the pre-atomic path: lookup, python-side active check, second lookup, update, commit, refresh
+    async with async_session_maker() as session:
+        dao = LinksDAO(session)
+        link = await dao.find_one_or_none_by_field(short_code=short_code)
+        if not link or not link.is_active:
+            return None
+        link = await dao.find_one_or_none_by_field(short_code=short_code)
+        link.click_count += 1
+        await session.commit()
+        await session.refresh(link)
+        return link.orig_url
+
+
+async def atomic_redirect(short_code: str) -> str | None:
+    async with async_session_maker() as session:
+        orig_url = await LinksDAO(session).redirect(short_code)
+        await session.commit()
+        return orig_url
+
+
+async def main(args) -> int:
+    logger.remove()
+    [seeded] = await seed(1, args.links)
+    codes = seeded["codes"]
+    scenarios = {}
+    for name, func in (("legacy", legacy_redirect), ("atomic", atomic_redirect)):
+        await measure(lambda: func(random.choice(codes)), min(args.requests, 100))
+        scenarios[name] = await measure(lambda: func(random.choice(codes)), args.requests)
+    await engine.dispose()
+    return report(args, scenarios, links=args.links)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5000)
+    add_report_arguments(parser)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,91 @@
+"""Compare response_model serialization with the orjson path for large list and stats responses.
+
+Rows are built in memory and both apps are called directly through the
+ASGI interface, so only validation and JSON rendering are measured; no
+database is needed:
+
+    python benchmarks/serialization.py --rows 10000 --repeat 20 [--output run.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.links.schemas import LinkRead, LinkStats
+from app.serialization import trusted_rows
+from benchmarks.common import add_report_arguments, asgi_request, measure, report
+
+
+def make_rows(count: int):
+    now = datetime.now()
+    links = [
+        SimpleNamespace(id=i, orig_url=f"https://bench.example/{i}", short_code=f"b{i:07d}", is_active=True,
+                        created_at=now, expires_at=now + timedelta(days=1), click_count=i, owner_id=1)
+        for i in range(count)
+    ]
+    stats = [
+        SimpleNamespace(short_code=link.short_code, orig_url=link.orig_url, last_hour_clicks=i, last_day_clicks=2 * i)
+        for i, link in enumerate(links)
+    ]
+    return links, stats
+
+
+def build_apps(links, stats) -> dict[str, FastAPI]:
+    # the endpoints as they were: ORM rows through response_model, LinkStats built one by one
+    before = FastAPI()
+
+    @before.get("/list", response_model=list[LinkRead])
+    async def list_before():
+        return links
+
+    @before.get("/stats", response_model=list[LinkStats], response_model_exclude_none=True)
+    async def stats_before():
+        return [
+            LinkStats(link=row.short_code, orig_link=row.orig_url, last_hour_clicks=row.last_hour_clicks,
+                      last_day_clicks=row.last_day_clicks)
+            for row in stats
+        ]
+
+    after = FastAPI()
+
+    @after.get("/list", response_model=list[LinkRead], response_class=ORJSONResponse)
+    async def list_after():
+        return ORJSONResponse(trusted_rows(LinkRead, links))
+
+    @after.get("/stats", response_model=list[LinkStats], response_class=ORJSONResponse)
+    async def stats_after():
+        return ORJSONResponse([
+            {"link": row.short_code, "orig_link": row.orig_url, "last_hour_clicks": row.last_hour_clicks,
+             "last_day_clicks": row.last_day_clicks}
+            for row in stats
+        ])
+
+    return {"response_model": before, "orjson": after}
+
+
+async def main(args) -> int:
+    links, stats = make_rows(args.rows)
+    apps = build_apps(links, stats)
+    scenarios = {}
+    for path in ("/list", "/stats"):
+        bodies = {name: json.loads((await asgi_request(app, "GET", path))[1]) for name, app in apps.items()}
+        assert bodies["response_model"] == bodies["orjson"], f"{path} bodies differ"
+        for name, app in apps.items():
+            scenarios[f"{path.strip('/')}_{name}"] = await measure(lambda: asgi_request(app, "GET", path), args.repeat)
+    return report(args, scenarios, rows=args.rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    add_report_arguments(parser)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,16 +1,146 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from loguru import logger
+
+from app.config import settings
+from app.log_config import configure_logging, AccessLogMiddleware
+from app.metrics import MetricsMiddleware, instrument_engine, registry
 from app.links.routes import public_router, private_router
 
 from app.auth.routers import router as users_router
+from app.auth.cache import user_cache
+from app.auth.utils import password_hasher
+from app.invalidation import invalidation_listener
+from app.dao.database import engine, pool_metrics, replica_engines, replica_pool_metrics, replica_router, dispose_engines
+from app.links.bloom import short_code_filter
+from app.links.cache import link_cache
+from app.links.lean_redirect import LeanRedirectRoute
+from app.links.click_buffer import click_buffer
+from app.links.expiry import expiry_sweeper
+from app.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    invalidation_listener.start()
+    short_code_filter.start()
+    click_buffer.start()
+    expiry_sweeper.start()
+    # the server only reports startup complete, and takes traffic, once this returns
+    await warm_up(
+        [(engine, True), *((replica, False) for replica in replica_engines)],
+        replica_router.session_maker(),
+        invalidation_listener,
+    )
+    yield
+    await expiry_sweeper.stop()
+    await short_code_filter.stop()
+    await invalidation_listener.stop()
+    await click_buffer.stop()
+    await dispose_engines()
+    password_hasher.shutdown()
+    await logger.complete()
+
+
+configure_logging()
 
 app = FastAPI(
     title="URL Alias Service",
     description="привет сокращайка ссылок",
     version="1.0.0",
+    lifespan=lifespan,
 )
+app.add_middleware(AccessLogMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+for instrumented in (engine, *replica_engines):
+    instrument_engine(instrumented)
+
+
+# monotonic totals in the stats dicts; exported as counters so rate() and increase() work on them
+CACHE_COUNTERS = frozenset({"hits", "misses", "evictions"})
+POOL_COUNTERS = frozenset({"checkouts", "wait_seconds_total", "overflow_events", "timeouts"})
+FILTER_COUNTERS = frozenset({"rejected", "rebuilds"})
+
+
+def _cache_samples(counters: bool):
+    for name, cache in (("links", link_cache), ("users", user_cache)):
+        for field, value in cache.stats().items():
+            if (field in CACHE_COUNTERS) == counters:
+                yield (name, field), value
+
+
+def _pool_samples(counters: bool):
+    pools = [("primary", engine, pool_metrics)]
+    pools += [(f"replica{i}", replica, metrics)
+              for i, (replica, metrics) in enumerate(zip(replica_engines, replica_pool_metrics))]
+    for name, pool_engine, metrics in pools:
+        for field, value in metrics.snapshot(pool_engine.pool).items():
+            if (field in POOL_COUNTERS) == counters:
+                yield (name, field), value
+
+
+def _filter_samples(counters: bool):
+    for field, value in short_code_filter.stats().items():
+        if (field in FILTER_COUNTERS) == counters:
+            yield (field,), value
+
+
+registry.gauge("app_cache", "In-process cache sizes.", ("cache", "field"), lambda: _cache_samples(False))
+registry.callback_counter("app_cache_events_total", "In-process cache hits, misses and evictions.", ("cache", "event"),
+                          lambda: _cache_samples(True))
+registry.gauge("db_pool", "Connection pool state and longest checkout wait.", ("database", "field"),
+               lambda: _pool_samples(False))
+registry.callback_counter("db_pool_events_total", "Connection pool checkouts, wait time, overflow and timeouts.",
+                          ("database", "event"), lambda: _pool_samples(True))
+registry.callback_counter("cache_invalidation_events_total",
+                          "Cache invalidations received from other workers and listener reconnects.", ("event",),
+                          lambda: [(("notification",), invalidation_listener.notifications),
+                                   (("reconnect",), invalidation_listener.reconnects)])
+registry.gauge("short_code_filter", "Bloom filter of issued short codes: size and fill.", ("field",),
+               lambda: _filter_samples(False))
+registry.callback_counter("short_code_filter_events_total", "Lookups rejected by the short code filter and its rebuilds.",
+                          ("event",), lambda: _filter_samples(True))
+registry.gauge("click_buffer_pending_clicks", "Clicks buffered in memory and not yet written.", (),
+               lambda: [((), click_buffer.pending_clicks)])
+registry.callback_counter("click_buffer_flushed_clicks_total", "Clicks written by the buffer since startup.", (),
+                          lambda: [((), click_buffer.flushed_clicks)])
+
+
+@app.get("/health/cache", tags=["health"])
+def cache_stats():
+    return {
+        "links": link_cache.stats(),
+        "users": user_cache.stats(),
+        "clicks": {
+            "pending": click_buffer.pending_clicks,
+            "flushed": click_buffer.flushed_clicks,
+            "flushes": click_buffer.flushes,
+        },
+    }
+
+
+@app.get("/health/pool", tags=["health"])
+def pool_stats():
+    snapshot = pool_metrics.snapshot(engine.pool)
+    snapshot["replicas"] = [
+        metrics.snapshot(replica.pool) for replica, metrics in zip(replica_engines, replica_pool_metrics)
+    ]
+    return snapshot
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 
 app.include_router(users_router, prefix="/api/auth", tags=["auth"])
 
+if settings.LEAN_REDIRECT:
+    # matched ahead of public_router's route, which stays in the OpenAPI docs
+    app.router.routes.append(LeanRedirectRoute())
 app.include_router(public_router, tags=["redirect"])
 app.include_router(private_router, prefix="/api/links", tags=["private"])
 
@@ -0,0 +1,34 @@
+"""added links expiry index
+
+Revision ID: 3f1c9a7e52b4
+Revises: dd40f24a2c44
+Create Date: 2026-10-18 12:05:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7e52b4'
+down_revision: Union[str, None] = 'dd40f24a2c44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built concurrently so the links table stays writable while the index is created
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'links_is_active_expires_at_idx', 'links', ['is_active', 'expires_at'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('links_is_active_expires_at_idx', table_name='links', postgresql_concurrently=True)
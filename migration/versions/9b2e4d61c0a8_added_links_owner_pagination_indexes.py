@@ -0,0 +1,38 @@
+"""added links owner pagination indexes
+
+Revision ID: 9b2e4d61c0a8
+Revises: e33afd257651
+Create Date: 2026-10-18 15:41:12.583907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2e4d61c0a8'
+down_revision: Union[str, None] = 'e33afd257651'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'links_owner_id_created_at_id_idx', 'links', ['owner_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'links_owner_id_is_active_created_at_id_idx', 'links', ['owner_id', 'is_active', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('links_owner_id_is_active_created_at_id_idx', table_name='links', postgresql_concurrently=True)
+        op.drop_index('links_owner_id_created_at_id_idx', table_name='links', postgresql_concurrently=True)
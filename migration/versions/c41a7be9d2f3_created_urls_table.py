@@ -0,0 +1,62 @@
+"""created urls table
+
+Revision ID: c41a7be9d2f3
+Revises: 9b2e4d61c0a8
+Create Date: 2026-10-18 16:02:31.418256
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7be9d2f3'
+down_revision: Union[str, None] = '9b2e4d61c0a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('urls',
+    sa.Column('url_hash', sa.LargeBinary(length=32), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('urls_pkey')),
+    sa.UniqueConstraint('url_hash', name=op.f('urls_url_hash_key'))
+    )
+    op.add_column('links', sa.Column('url_id', sa.Integer(), nullable=True))
+    # existing URLs are interned as stored; the digest matches app.links.utils.url_digest
+    op.execute(
+        "INSERT INTO urls (url_hash, url) "
+        "SELECT DISTINCT sha256(convert_to(orig_url, 'UTF8')), orig_url FROM links "
+        "ON CONFLICT (url_hash) DO NOTHING"
+    )
+    op.execute(
+        "UPDATE links SET url_id = urls.id FROM urls "
+        "WHERE urls.url_hash = sha256(convert_to(links.orig_url, 'UTF8'))"
+    )
+    op.alter_column('links', 'url_id', nullable=False)
+    op.create_foreign_key(op.f('links_url_id_fkey'), 'links', 'urls', ['url_id'], ['id'])
+    op.drop_column('links', 'orig_url')
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'links_owner_id_url_id_idx', 'links', ['owner_id', 'url_id'],
+            unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('links_owner_id_url_id_idx', table_name='links', postgresql_concurrently=True)
+    op.add_column('links', sa.Column('orig_url', sa.VARCHAR(), autoincrement=False, nullable=True))
+    op.execute("UPDATE links SET orig_url = urls.url FROM urls WHERE urls.id = links.url_id")
+    op.alter_column('links', 'orig_url', nullable=False)
+    op.drop_constraint(op.f('links_url_id_fkey'), 'links', type_='foreignkey')
+    op.drop_column('links', 'url_id')
+    op.drop_table('urls')
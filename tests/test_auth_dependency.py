@@ -4,6 +4,5 @@ from fastapi import HTTPException
 
 @pytest.mark.asyncio
 async def test_get_current_user_invalid_token():
-    class FakeSession: pass
     with pytest.raises(HTTPException):
-        await get_current_user(token="badtoken", session=FakeSession()) 
\ No newline at end of file
+        await get_current_user(token="badtoken")
\ No newline at end of file
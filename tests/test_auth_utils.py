@@ -1,4 +1,10 @@
-from app.auth.utils import get_password_hash, verify_password
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.auth.utils import get_password_hash, verify_password, PasswordHasher, pwd_context
 
 def test_password_hash_and_verify():
     password = "supersecret"
@@ -7,3 +13,27 @@ def test_password_hash_and_verify():
     assert verify_password(password, hash_)
     assert not verify_password("wrong", hash_)
 
+
+
+@pytest.mark.asyncio
+async def test_hasher_rehashes_when_cost_changes():
+    hasher = PasswordHasher(workers=1, queue_size=1, queue_timeout=5)
+    cheap_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    valid, new_hash = await hasher.verify_and_update("secret", cheap_hash)
+    assert valid
+    assert new_hash is not None and not pwd_context.needs_update(new_hash)
+    assert await hasher.verify_and_update("wrong", cheap_hash) == (False, None)
+    assert await hasher.verify_and_update("secret", new_hash) == (True, None)
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, queue_size=0, queue_timeout=0.01)
+    busy = asyncio.ensure_future(hasher.hash("secret"))
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException) as excinfo:
+        await hasher.hash("other")
+    assert excinfo.value.status_code == 503
+    assert await busy
+    hasher.shutdown()
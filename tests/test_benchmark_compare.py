@@ -0,0 +1,24 @@
+from benchmarks.common import compare, percentile
+
+
+def scenario(p50, p95, p99, rps):
+    return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "throughput_rps": rps}
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 51
+    assert percentile(values, 0.99) == 100
+
+
+def test_compare_flags_only_changes_beyond_the_threshold():
+    baseline = {"scenarios": {"redirect": scenario(2.0, 4.0, 8.0, 1000), "list": scenario(5, 9, 12, 200)}}
+    current = {"scenarios": {
+        "redirect": scenario(2.1, 4.0, 9.0, 850),
+        "list": scenario(5, 9, 12, 200),
+        "stats": scenario(50, 90, 120, 10),
+    }}
+    assert compare(current, baseline, 0.10) == [
+        "redirect p99_ms: 8.00 -> 9.00",
+        "redirect throughput_rps: 1000.0 -> 850.0",
+    ]
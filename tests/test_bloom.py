@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.links.bloom import BloomFilter, ShortCodeFilter
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    codes = [f"code{i}" for i in range(10000)]
+    for code in codes:
+        bloom.add(code)
+    assert all(code in bloom for code in codes)
+    false_positives = sum(f"other{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+    assert bloom.false_positive_rate() == pytest.approx(0.01, rel=0.2)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def session_factory(codes, during_scan=None):
+    class Result:
+        def scalars(self):
+            return self
+
+        async def partitions(self):
+            if during_scan:
+                during_scan()
+            yield list(codes)
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def scalar(self, query):
+            return len(codes)
+
+        async def stream(self, query):
+            return Result()
+
+    return FakeSession
+
+
+@pytest.mark.asyncio
+async def test_filter_passes_everything_until_built_then_rejects_unknown_codes():
+    clock = FakeClock()
+    short_codes = ShortCodeFilter(100, 0.001, 60, 10, replay_window=5, session_factory=session_factory(["a1"]),
+                                  clock=clock)
+    assert short_codes.might_contain("zz")
+    clock.now = 1.0
+    short_codes.add("old")
+    clock.now = 7.0
+    # committed after the scan's snapshot but added before the rebuild started
+    short_codes.add("recent")
+    clock.now = 10.0
+    assert await short_codes.rebuild()
+    assert short_codes.might_contain("a1")
+    assert short_codes.might_contain("recent")
+    assert not short_codes.might_contain("old")
+    assert not short_codes.might_contain("zz")
+    assert short_codes.stats()["rejected"] == 2
+    short_codes.add("new")
+    assert short_codes.might_contain("new")
+    short_codes.reset()
+    assert short_codes.might_contain("zz")
+
+
+@pytest.mark.asyncio
+async def test_reset_during_rebuild_discards_the_stale_scan():
+    short_codes = ShortCodeFilter(100, 0.001, 60, 10)
+    short_codes._session_factory = session_factory(["a1"], during_scan=short_codes.reset)
+    assert not await short_codes.rebuild()
+    assert not short_codes.ready
+
+
+@pytest.mark.asyncio
+async def test_filter_only_answers_while_the_subscription_it_was_built_under_is_up():
+    listener = SimpleNamespace(connected=asyncio.Event(), connections=0)
+    short_codes = ShortCodeFilter(100, 0.001, 60, 10, session_factory=session_factory(["a1"]))
+    short_codes.follow(listener)
+    rebuild = asyncio.create_task(short_codes.rebuild())
+    await asyncio.sleep(0)
+    # the snapshot waits for LISTEN, or codes issued in between would be missed
+    assert not rebuild.done()
+    listener.connections = 1
+    listener.connected.set()
+    assert await rebuild
+    assert not short_codes.might_contain("zz")
+    # notifications are lost while disconnected
+    listener.connected.clear()
+    assert short_codes.might_contain("zz")
+    listener.connections = 2
+    listener.connected.set()
+    assert short_codes.might_contain("zz")
+    assert await short_codes.rebuild()
+    assert not short_codes.might_contain("zz")
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.links.click_buffer import ClickBuffer
+
+
+class FakeSession:
+    def __init__(self, calls, fail=False):
+        self.calls = calls
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        if self.fail:
+            raise RuntimeError("db is down")
+        self.calls.append(params)
+
+    async def commit(self): pass
+
+
+@pytest.mark.asyncio
+async def test_clicks_are_aggregated_into_one_batch():
+    calls = []
+    buffer = ClickBuffer(flush_interval=60, flush_threshold=100, session_factory=lambda: FakeSession(calls))
+    for _ in range(3):
+        buffer.add("abc")
+    buffer.add("xyz")
+    assert await buffer.flush() == 4
+    assert len(calls) == 2
+    assert sorted(calls[0], key=lambda p: p["code"]) == [
+        {"code": "abc", "clicks": 3},
+        {"code": "xyz", "clicks": 1},
+    ]
+    assert buffer.pending_clicks == 0
+
+
+@pytest.mark.asyncio
+async def test_threshold_triggers_flush_and_stop_drains():
+    calls = []
+    buffer = ClickBuffer(flush_interval=60, flush_threshold=2, session_factory=lambda: FakeSession(calls))
+    buffer.add("abc")
+    buffer.add("abc")
+    await asyncio.sleep(0)
+    assert calls[0] == [{"code": "abc", "clicks": 2}]
+    buffer.start()
+    buffer.add("xyz")
+    await buffer.stop()
+    assert calls[-2] == [{"code": "xyz", "clicks": 1}]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_clicks():
+    buffer = ClickBuffer(flush_interval=60, flush_threshold=100, session_factory=lambda: FakeSession([], fail=True))
+    buffer.add("abc", 5)
+    assert await buffer.flush() == 0
+    assert buffer.pending_clicks == 5
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_minute_and_hour_buckets():
+    calls = []
+    buffer = ClickBuffer(flush_interval=60, flush_threshold=100, session_factory=lambda: FakeSession(calls))
+    buffer.add("abc", 2)
+    buffer.add("xyz", counted=True)
+    await buffer.flush()
+    counts, buckets = calls
+    assert counts == [{"code": "abc", "clicks": 2}]
+    by_key = {(row["code"], row["granularity"]): row for row in buckets}
+    assert by_key[("abc", "minute")]["clicks"] == 2
+    assert by_key[("abc", "hour")]["clicks"] == 2
+    assert by_key[("xyz", "hour")]["clicks"] == 1
+    assert by_key[("abc", "hour")]["bucket_start"].minute == 0
+
+
+@pytest.mark.asyncio
+async def test_click_counts_are_written_in_short_code_order():
+    calls = []
+    buffer = ClickBuffer(flush_interval=60, flush_threshold=100, session_factory=lambda: FakeSession(calls))
+    for short_code in ("zzz", "abc", "mmm"):
+        buffer.add(short_code)
+    await buffer.flush()
+    # row locks in one order across workers, so concurrent flushes cannot deadlock
+    assert [p["code"] for p in calls[0]] == ["abc", "mmm", "zzz"]
+
+
+def test_bucket_rows_are_upserted_in_key_order():
+    rows = ClickBuffer._bucket_rows({("zzz", 100): 1, ("abc", 101): 1, ("abc", 100): 1})
+    keys = [(row["code"], row["granularity"], row["bucket_start"]) for row in rows]
+    assert keys == sorted(keys)
+    assert keys[0][:2] == ("abc", "hour")
@@ -0,0 +1,63 @@
+import pytest
+
+from app.links.code_allocator import CodeAllocator, SequenceCodeAllocator, RandomCodeAllocator
+from app.links.utils import encode_base62, decode_base62
+
+
+class FakeSession:
+    def __init__(self):
+        self.next_id = 1
+        self.leases = []
+
+    async def execute(self, query, params):
+        self.leases.append(params["count"])
+        ids = list(range(self.next_id, self.next_id + params["count"]))
+        self.next_id += params["count"]
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return ids
+        return Result()
+
+
+def test_base62_round_trip():
+    for number in (0, 1, 61, 62, 123456789):
+        assert decode_base62(encode_base62(number, 7)) == number
+    with pytest.raises(ValueError):
+        encode_base62(62 ** 2, 2)
+
+
+@pytest.mark.asyncio
+async def test_sequence_allocator_leases_blocks_and_decodes():
+    session = FakeSession()
+    allocator = SequenceCodeAllocator(block_size=10)
+    first = await allocator.allocate(session, 3)
+    second = await allocator.allocate(session, 7)
+    third = await allocator.allocate(session, 1)
+    assert session.leases == [10, 10]
+    ids = [link_id for link_id, _ in first + second + third]
+    assert ids == list(range(1, 12))
+    codes = [code for _, code in first + second + third]
+    assert len(set(codes)) == len(codes)
+    assert all(len(code) == SequenceCodeAllocator.LENGTH for code in codes)
+    assert all(allocator.decode(code) == link_id for link_id, code in first + second + third)
+    assert allocator.decode("abcdefgh") is None
+
+
+@pytest.mark.asyncio
+async def test_random_allocator_has_no_ids():
+    allocations = await RandomCodeAllocator().allocate(None, 2)
+    assert [link_id for link_id, _ in allocations] == [None, None]
+    assert all(len(code) == 8 for _, code in allocations)
+
+
+def test_incomplete_allocator_fails_on_instantiation():
+    class NoSample(CodeAllocator):
+        async def allocate(self, session, count):
+            return []
+
+    with pytest.raises(TypeError):
+        NoSample()
@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# tooling that must stay out of a worker's import of main
+DEFERRED_MODULES = ["alembic", "app.maintenance", "benchmarks", "uvicorn", "httpx"]
+
+# everything main imports beyond fastapi and sqlalchemy (the app itself, pydantic settings, jose, passlib,
+# asyncpg, loguru...) may cost at most this multiple of those two; today it is about 0.5. Measured within one
+# -X importtime run, so a slow or loaded machine scales both sides alike.
+IMPORT_COST_CEILING = 1.5
+FRAMEWORKS = ("fastapi", "sqlalchemy")
+
+PROBE = """
+import json, sys
+import main
+from app.dao.database import engine, replica_engines
+print(json.dumps({
+    "connections": [(e.pool.checkedin(), e.pool.checkedout()) for e in (engine, *replica_engines)],
+    "loaded": sorted(m for m in %r if m in sys.modules),
+}))
+""" % DEFERRED_MODULES
+
+
+def cumulative_import_times(report: str) -> dict[str, int]:
+    # lines look like "import time:      self [us] |  cumulative | <indent>module"
+    times = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def test_importing_main_defers_connections_and_tooling_and_stays_within_budget():
+    # a fresh interpreter: the test session has already imported everything
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], cwd=ROOT, capture_output=True,
+                            text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    # the lifespan opens the pool connections, not the import
+    assert all(connections == [0, 0] for connections in probe["connections"])
+    assert probe["loaded"] == []
+
+    times = cumulative_import_times(result.stderr)
+    frameworks = sum(times[name] for name in FRAMEWORKS)
+    rest = times["main"] - frameworks
+    assert rest <= IMPORT_COST_CEILING * frameworks, (
+        f"importing main costs {rest / 1000:.0f}ms beyond fastapi and sqlalchemy ({frameworks / 1000:.0f}ms)"
+    )
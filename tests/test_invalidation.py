@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.invalidation import InvalidationListener, asyncpg_dsn
+
+
+class FakeConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.on_terminate = None
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def execute(self, query):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+
+    def notify(self, payload):
+        self.listeners["invalidate"](self, 1, "invalidate", payload)
+
+    def drop(self):
+        self.closed = True
+        self.on_terminate(self)
+
+
+@pytest.mark.asyncio
+async def test_listener_evicts_keys_and_flushes_after_reconnect():
+    connections = []
+
+    async def connect(dsn):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    evicted, flushes = [], []
+    listener = InvalidationListener("postgresql://", "invalidate", reconnect_interval=0, keepalive_interval=60,
+                                    connect=connect)
+    listener.register("link", evicted.append, lambda: flushes.append("link"))
+    listener.start()
+    try:
+        await asyncio.wait_for(listener.connected.wait(), 1)
+        connections[0].notify("link:abc")
+        connections[0].notify("unknown:1")
+        assert evicted == ["abc"]
+        assert flushes == []
+
+        connections[0].drop()
+        while len(connections) < 2 or not listener.connected.is_set():
+            await asyncio.sleep(0)
+        assert flushes == ["link"]
+        assert listener.reconnects == 1
+        connections[1].notify("link:def")
+        assert evicted == ["abc", "def"]
+    finally:
+        await listener.stop()
+    assert connections[1].closed
+
+
+def test_asyncpg_dsn_drops_the_sqlalchemy_driver():
+    dsn = asyncpg_dsn("postgresql+asyncpg://user:secret@db:5432/shortener")
+    assert dsn == "postgresql://user:secret@db:5432/shortener"
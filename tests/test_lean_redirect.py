@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.links.cache import link_cache, CachedLink
+from app.links.click_buffer import click_buffer
+from app.links.lean_redirect import LeanRedirect, LeanRedirectRoute
+
+
+async def call(short_code):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await LeanRedirect()({"type": "http", "method": "GET", "path_params": {"short_code": short_code}}, None, send)
+    start, body = messages
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+@pytest.mark.asyncio
+async def test_cached_link_redirects_without_touching_the_database():
+    link_cache.set("lean1", CachedLink("lean1", "https://example.com/a b?q=1", True, datetime.now() + timedelta(days=1)))
+    pending = click_buffer.pending_clicks
+    status, headers, body = await call("lean1")
+    assert status == 307
+    assert headers[b"location"] == b"https://example.com/a%20b?q=1"
+    assert body == b""
+    assert click_buffer.pending_clicks == pending + 1
+
+
+@pytest.mark.asyncio
+async def test_inactive_cached_link_gets_the_usual_404_body():
+    link_cache.set("lean2", CachedLink("lean2", "https://example.com/", False, datetime.now() + timedelta(days=1)))
+    status, headers, body = await call("lean2")
+    assert status == 404
+    assert headers[b"content-type"] == b"application/json"
+    assert body == b'{"detail":"Link not found or expired"}'
+
+
+def test_route_exposes_itself_for_route_template_labels():
+    route = LeanRedirectRoute()
+    _, child_scope = route.matches({"type": "http", "path": "/abc", "method": "GET", "root_path": ""})
+    assert child_scope["route"] is route
+    assert child_scope["path_params"] == {"short_code": "abc"}
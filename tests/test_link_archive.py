@@ -0,0 +1,89 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.links.dao import LinksDAO
+from app.links.link_service import LinkService
+from app.maintenance import archive_links
+
+
+class FakeSession:
+    def __init__(self, batches, statements):
+        self.batches = batches
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        self.statements.append(str(query.compile(dialect=postgresql.dialect())))
+        batch = self.batches.pop(0) if self.batches else []
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return batch
+        return Result()
+
+    async def commit(self): pass
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_links_in_bounded_batches():
+    statements = []
+    batches = [["a1", "a2"], ["a3"]]
+    moved = await archive_links(retention_days=30, batch_size=2,
+                                session_factory=lambda: FakeSession(batches, statements))
+    assert moved == 3
+    assert len(statements) == 2
+    # the DELETE feeds the INSERT within one statement
+    assert statements[0].startswith("WITH moved AS \n(DELETE FROM links")
+    assert "FOR UPDATE SKIP LOCKED" in statements[0]
+    assert "INSERT INTO links_archive" in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_archive_stops_after_max_batches():
+    statements = []
+    batches = [["a1"], ["a2"], ["a3"]]
+    moved = await archive_links(retention_days=30, batch_size=1, max_batches=2,
+                                session_factory=lambda: FakeSession(batches, statements))
+    assert moved == 2
+
+
+def test_stats_query_only_reads_archive_when_asked():
+    dao = LinksDAO(None)
+    now = datetime.now()
+    hot = str(dao._link_stats_query(1, now, now).compile(dialect=postgresql.dialect()))
+    both = str(dao._link_stats_query(1, now, now, include_archived=True).compile(dialect=postgresql.dialect()))
+    assert "links_archive" not in hot
+    assert "UNION ALL" in both and "links_archive" in both
+
+
+@pytest.mark.asyncio
+async def test_archived_stats_are_flagged_and_have_no_series():
+    rows = [
+        SimpleNamespace(short_code="live1", orig_url="https://a.example/", last_hour_clicks=1, last_day_clicks=2,
+                        archived=False),
+        SimpleNamespace(short_code="dead1", orig_url="https://b.example/", last_hour_clicks=0, last_day_clicks=0,
+                        archived=True),
+    ]
+    series = [SimpleNamespace(short_code="dead1", bucket_start=datetime.now(), clicks=5)]
+
+    class StatsSession:
+        async def execute(self, query):
+            sql = str(query.compile(dialect=postgresql.dialect()))
+            result = series if "link_click_buckets.clicks \nFROM" in sql else rows
+            return SimpleNamespace(all=lambda: result)
+
+    stats = await LinkService.get_link_stats(StatsSession(), 1, granularity="hour", include_archived=True)
+    assert [(s["link"], s["archived"], s["series"]) for s in stats] == [("live1", False, []), ("dead1", True, [])]
+    stats = await LinkService.get_link_stats(StatsSession(), 1)
+    assert all("archived" not in s and "series" not in s for s in stats)
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import app.links.cache as cache_module
+from app.cache import LRUCache
+from app.dao.database import replica_router
+from app.links.cache import link_cache, CachedLink, invalidate_link, flush_links, recently_invalidated
+from app.links.link_service import LinkService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = LRUCache(max_size=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+    clock.now = 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    clock.now = 6
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_redirect_served_from_cache():
+    class FakeSession:
+        async def execute(self, query):
+            raise AssertionError("cache hit must not touch the database")
+
+    link_cache.clear()
+    link_cache.set("cached1", CachedLink("cached1", "https://cached.example/", False, None))
+    with pytest.raises(HTTPException) as excinfo:
+        await LinkService.redirect_link(FakeSession(), "cached1")
+    assert excinfo.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_deactivate_invalidates_cache_entry():
+    link = type("Link", (), {"id": 2, "short_code": "cached2", "is_active": True, "owner_id": 1})()
+
+    class FakeSession:
+        async def execute(self, query):
+            class Result:
+                def scalars(self):
+                    return type("Scalars", (), {"first": lambda self: link})()
+            return Result()
+
+    link_cache.set("cached2", CachedLink("cached2", "https://cached.example/", True, None))
+    await LinkService.deactivate_link(FakeSession(), link)
+    assert link_cache.get("cached2") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidated_codes_are_reloaded_from_the_primary(monkeypatch):
+    picked = []
+
+    class FakeConnection:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, query):
+            row = SimpleNamespace(short_code="stale1", orig_url="https://stale.example/", is_active=True,
+                                  expires_at=datetime.now() + timedelta(days=1))
+            return SimpleNamespace(first=lambda: row)
+
+    def connect(primary):
+        picked.append(primary)
+        return FakeConnection()
+
+    monkeypatch.setattr(cache_module, "_flushed_at", float("-inf"))
+    link_cache.clear()
+    try:
+        await LinkService.resolve_redirect(connect, "stale1")
+        invalidate_link("stale1")
+        await LinkService.resolve_redirect(connect, "stale1")
+        await LinkService.resolve_redirect(connect, "stale2")
+        # a flush after missed notifications sends every miss to the primary for a while
+        flush_links()
+        await LinkService.resolve_redirect(connect, "stale2")
+    finally:
+        recently_invalidated.invalidate("stale1")
+        link_cache.clear()
+    assert picked == [False, True, False, True]
+
+
+@pytest.mark.asyncio
+async def test_code_missing_on_a_replica_is_retried_on_the_primary(monkeypatch):
+    picked = []
+    row = SimpleNamespace(short_code="new1", orig_url="https://new.example/", is_active=True,
+                          expires_at=datetime.now() + timedelta(days=1))
+
+    class FakeConnection:
+        def __init__(self, primary):
+            self.primary = primary
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, query):
+            # the replica has not replayed the INSERT yet
+            return SimpleNamespace(first=lambda: row if self.primary else None)
+
+    def connect(primary):
+        picked.append(primary)
+        return FakeConnection(primary)
+
+    monkeypatch.setattr(cache_module, "_flushed_at", float("-inf"))
+    monkeypatch.setattr(replica_router, "replicas", [object()])
+    link_cache.clear()
+    try:
+        assert await LinkService.resolve_redirect(connect, "new1") == "https://new.example/"
+    finally:
+        link_cache.clear()
+    assert picked == [False, True]
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from fastapi import HTTPException
+
+from app.links.cache import link_cache, CachedLink
+from app.links.expiry import ExpirySweeper
+from app.links.link_service import LinkService
+
+
+class FakeSession:
+    def __init__(self, batches, statements):
+        self.batches = batches
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        self.statements.append(str(query.compile(dialect=postgresql.dialect())))
+        batch = self.batches.pop(0) if self.batches else []
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return batch
+        return Result()
+
+    async def commit(self): pass
+
+
+@pytest.mark.asyncio
+async def test_expired_cached_link_is_not_redirected():
+    class NoDbSession:
+        async def execute(self, query):
+            raise AssertionError("unexpected query")
+
+    link_cache.clear()
+    expired = CachedLink("expired1", "https://old.example/", True, datetime.now() - timedelta(seconds=1))
+    link_cache._data["expired1"] = (float("inf"), expired)
+    with pytest.raises(HTTPException) as excinfo:
+        await LinkService.redirect_link(NoDbSession(), "expired1")
+    assert excinfo.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_sweeper_works_in_bounded_batches_and_invalidates_cache():
+    statements = []
+    batches = [["a1", "a2"], ["a3"]]
+    link_cache.set("a3", CachedLink("a3", "https://a3.example/", True, datetime.now() + timedelta(days=1)))
+    sweeper = ExpirySweeper(interval=0, batch_size=2, session_factory=lambda: FakeSession(batches, statements))
+    assert await sweeper.sweep() == 3
+    assert len(statements) == 2
+    assert statements[0].startswith("UPDATE links SET is_active")
+    assert "FOR UPDATE SKIP LOCKED" in statements[0]
+    assert link_cache.get("a3") is None
+
+
+@pytest.mark.asyncio
+async def test_purge_sweeper_deletes_rows():
+    statements = []
+    sweeper = ExpirySweeper(interval=0, batch_size=10, purge=True,
+                            session_factory=lambda: FakeSession([["a1"]], statements))
+    assert await sweeper.sweep() == 1
+    assert statements[0].startswith("DELETE FROM links")
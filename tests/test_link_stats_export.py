@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from app.links.link_service import LinkService
+
+
+class FakeStreamResult:
+    def __init__(self, partitions):
+        self._partitions = partitions
+
+    async def partitions(self):
+        for partition in self._partitions:
+            yield partition
+
+
+class FakeSession:
+    def __init__(self, partitions):
+        self._partitions = partitions
+        self.options = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, query):
+        self.options = query.get_execution_options()
+        return FakeStreamResult(self._partitions)
+
+
+PARTITIONS = [
+    [("abc", "https://a.com/", 1, 2), ("def", "https://d.com/", 0, 5)],
+    [("ghi", "https://g.com/", 3, 3)],
+]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_yields_one_chunk_per_partition():
+    session = FakeSession(PARTITIONS)
+    chunks = [chunk async for chunk in LinkService.stream_link_stats(lambda: session, 1, "ndjson")]
+    assert len(chunks) == 2
+    assert "yield_per" in session.options
+    rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert rows[1] == {"link": "def", "orig_link": "https://d.com/", "last_hour_clicks": 0, "last_day_clicks": 5}
+
+
+@pytest.mark.asyncio
+async def test_csv_export_starts_with_header():
+    session = FakeSession(PARTITIONS)
+    chunks = [chunk async for chunk in LinkService.stream_link_stats(lambda: session, 1, "csv")]
+    lines = "".join(chunks).splitlines()
+    assert lines[0] == "link,orig_link,last_hour_clicks,last_day_clicks"
+    assert lines[3] == "ghi,https://g.com/,3,3"
@@ -1,4 +1,7 @@
 import pytest
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.dml import Insert
+
 from app.links.dao import LinksDAO
 
 @pytest.mark.asyncio
@@ -14,4 +17,61 @@ async def test_increment_click_not_found():
             return Result()
     dao = LinksDAO(FakeSession())
     result = await dao.increment_click("notfound")
-    assert result is None 
\ No newline at end of file
+    assert result is None 
+
+@pytest.mark.asyncio
+async def test_redirect_is_a_single_statement():
+    statements = []
+
+    class FakeSession:
+        async def execute(self, query):
+            statements.append(query)
+
+            class Result:
+                def scalar_one_or_none(self):
+                    return "https://example.com/"
+            return Result()
+
+    dao = LinksDAO(FakeSession())
+    assert await dao.redirect("abc") == "https://example.com/"
+    assert len(statements) == 1
+    sql = str(statements[0])
+    assert sql.startswith("UPDATE links")
+    assert "RETURNING urls.url" in sql
+    assert "links.is_active" in sql and "links.expires_at" in sql
+
+
+@pytest.mark.asyncio
+async def test_create_links_retries_only_colliding_codes(monkeypatch):
+    import app.links.code_allocator as code_allocator
+    codes = iter(["taken", "free1", "free2"])
+    monkeypatch.setattr(code_allocator, "generate_short_code", lambda length: next(codes))
+    inserted = []
+
+    class FakeSession:
+        async def execute(self, query):
+            # both statements wrap their INSERT in a CTE; read the values off the INSERT itself
+            params = next(e for e in visitors.iterate(query) if isinstance(e, Insert)).compile().params
+            if "INSERT INTO urls" in str(query):
+                # URL interning: hand out ids in order
+                digests = [v for k, v in params.items() if k.startswith("url_hash")]
+                rows = [type("Row", (), {"id": i, "url_hash": digest})() for i, digest in enumerate(digests)]
+            else:
+                batch = [v for k, v in params.items() if k.startswith("short_code")]
+                url_ids = [v for k, v in params.items() if k.startswith("url_id")]
+                inserted.append(batch)
+                rows = [
+                    type("Row", (), {"short_code": code, "url_id": url_id})()
+                    for code, url_id in zip(batch, url_ids) if code != "taken"
+                ]
+
+            class Result:
+                def all(self):
+                    return rows
+            return Result()
+
+    dao = LinksDAO(FakeSession())
+    created = await dao.create_links(["https://a.com/", "https://b.com/"], owner_id=1)
+    assert inserted == [["taken", "free1"], ["free2"]]
+    assert [row.url_id for row in created] == [0, 1]
+    assert [row.short_code for row in created] == ["free2", "free1"]
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.dependencies.links_dependency import get_cursor_param
+from app.links.dao import LinksDAO
+from app.links.utils import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 6, 3, 19, 44, 24, 170123)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+    assert get_cursor_param(cursor) == (created_at, 42)
+    assert get_cursor_param(None) is None
+    with pytest.raises(HTTPException) as excinfo:
+        get_cursor_param("not-a-cursor")
+    assert excinfo.value.status_code == 400
+
+
+def test_cursor_with_a_timezone_is_rejected():
+    cursor = encode_cursor(datetime.fromisoformat("2025-01-01T00:00:00+00:00"), 42)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+    with pytest.raises(HTTPException) as excinfo:
+        get_cursor_param(cursor)
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cursor_page_uses_keyset_predicate_instead_of_offset():
+    statements = []
+
+    class FakeSession:
+        async def execute(self, query):
+            statements.append(str(query))
+
+            class Result:
+                def scalars(self):
+                    return self
+
+                def all(self):
+                    return []
+            return Result()
+
+    await LinksDAO(FakeSession()).get_links_for_user(1, cursor=(datetime(2025, 1, 1), 10), limit=5)
+    sql = statements[0]
+    assert "(links.created_at, links.id) <" in sql
+    assert "ORDER BY links.created_at DESC, links.id DESC" in sql
+    assert "OFFSET" not in sql
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+from loguru import logger
+
+from app.log_config import AccessLogMiddleware, RouteSampler
+
+
+def test_sampler_uses_per_route_rates_and_keeps_server_errors():
+    sampler = RouteSampler({"/{short_code}": 0.25, "/quiet": 0.0}, default_rate=1.0, rng=lambda: 0.5)
+    assert sampler.should_log("/api/links/list", 200)
+    assert not sampler.should_log("/{short_code}", 307)
+    assert not sampler.should_log("/quiet", 404)
+    assert sampler.should_log("/quiet", 503)
+    assert RouteSampler({"/{short_code}": 0.25}, rng=lambda: 0.1).should_log("/{short_code}", 307)
+
+
+@pytest.mark.asyncio
+async def test_access_log_records_route_template_and_status():
+    records = []
+    sink_id = logger.add(lambda message: records.append(message.record), level="INFO")
+
+    async def app(scope, receive, send):
+        scope["route"] = SimpleNamespace(path="/{short_code}")
+        await send({"type": "http.response.start", "status": 307, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = AccessLogMiddleware(app, sampler=RouteSampler({}, default_rate=1.0))
+    try:
+        await middleware({"type": "http", "method": "GET", "path": "/abc1234"}, None, send)
+    finally:
+        logger.remove(sink_id)
+    [record] = [r for r in records if r["extra"].get("access")]
+    assert record["extra"]["route"] == "/{short_code}"
+    assert record["extra"]["path"] == "/abc1234"
+    assert record["extra"]["status"] == 307
+    assert record["extra"]["duration_ms"] >= 0
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.metrics import MetricsRegistry, MetricsMiddleware, db_queries_per_request, http_requests, instrument_engine
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    latency.observe(0.05, "/a")
+    latency.observe(0.5, "/a")
+    latency.observe(5.0, "/a")
+    registry.counter("hits_total", "Hits.", ("route",)).inc('/"b"')
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert 'hits_total{route="/\\"b\\""} 1' in lines
+
+
+@pytest.mark.asyncio
+async def test_middleware_counts_queries_per_request_route():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    async def app(scope, receive, send):
+        scope["route"] = SimpleNamespace(path="/metrics-test/{code}")
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    await MetricsMiddleware(app)({"type": "http", "method": "GET", "path": "/metrics-test/x"}, None, send)
+    assert http_requests.value("GET", "/metrics-test/{code}", "200") == 1
+    assert db_queries_per_request.count("/metrics-test/{code}") == 1
+    assert db_queries_per_request.total("/metrics-test/{code}") == 2
+
+
+def test_monotonic_totals_are_exported_as_counters():
+    import main  # registers the app's callback metrics
+    from app.metrics import registry
+
+    lines = registry.render().splitlines()
+    for name in ("app_cache_events_total", "db_pool_events_total", "cache_invalidation_events_total",
+                 "short_code_filter_events_total", "click_buffer_flushed_clicks_total"):
+        assert f"# TYPE {name} counter" in lines
+    assert 'app_cache_events_total{cache="links",event="hits"}' in "\n".join(lines)
+    # the gauges keep only point-in-time values
+    assert not any(line.startswith("app_cache{") and 'field="hits"' in line for line in lines)
+    assert not any(line.startswith("short_code_filter{") and 'field="rejected"' in line for line in lines)
@@ -0,0 +1,32 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.dao.pool import PoolMetrics, instrumented_pool_class
+
+
+def test_pool_metrics_track_checkouts_overflow_and_timeouts():
+    metrics = PoolMetrics()
+    pool_class = instrumented_pool_class(metrics, base=QueuePool)
+    pool = pool_class(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=1, timeout=0.01)
+    first = pool.connect()
+    second = pool.connect()
+    assert metrics.snapshot(pool)["checked_out"] == 2
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    first.close()
+    second.close()
+    snapshot = metrics.snapshot(pool)
+    assert snapshot["checkouts"] == 2
+    assert snapshot["overflow_events"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checked_out"] == 0
+
+
+def test_recreated_pool_keeps_reporting_to_the_same_metrics():
+    metrics = PoolMetrics()
+    pool = instrumented_pool_class(metrics, base=QueuePool)(lambda: sqlite3.connect(":memory:"), pool_size=1)
+    pool.recreate().connect().close()
+    assert metrics.checkouts == 1
@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+import app.dependencies.dao_dependency as dao_dependency
+import app.links.code_allocator as code_allocator
+from app.auth.cache import user_cache, UserSnapshot
+from app.auth.token_service import TokenService
+from app.dao.database import replica_router
+from app.links.cache import link_cache
+from app.links.utils import url_digest
+from main import app
+
+
+def make_link(**overrides):
+    now = datetime.now()
+    values = {
+        "id": 1,
+        "orig_url": "https://example.com/",
+        "url_id": 1,
+        # interned URL rows are served from the same fake result
+        "url_hash": url_digest("https://example.com/"),
+        "short_code": "abc1234",
+        "is_active": True,
+        "created_at": now,
+        "expires_at": now + timedelta(days=1),
+        "click_count": 0,
+        "owner_id": 1,
+        # and so are user rows
+        "username": "counted",
+        # stats rows are served from the same fake result
+        "last_hour_clicks": 0,
+        "last_day_clicks": 0,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar_one_or_none(self):
+        return self.first()
+
+
+class RoundTrips(list):
+    """The statements sent, plus how many pooled connections were held at once."""
+
+    checked_out = 0
+    max_checked_out = 0
+
+
+class FakeSession:
+    """Records every round trip the real session would make."""
+
+    def __init__(self, log, rows):
+        self.log = log
+        self.rows = rows
+        self.in_transaction = False
+        self.holds_connection = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+    def _release(self):
+        if self.holds_connection:
+            self.log.checked_out -= 1
+            self.holds_connection = False
+
+    async def execute(self, query):
+        self.log.append(str(query).split()[0])
+        self.in_transaction = True
+        # a session checks out its connection on first use and keeps it until the transaction ends or it closes
+        if not self.holds_connection:
+            self.holds_connection = True
+            self.log.checked_out += 1
+            self.log.max_checked_out = max(self.log.max_checked_out, self.log.checked_out)
+        return FakeResult(self.rows)
+
+    async def stream(self, query):
+        # the export route reads through a server-side cursor
+        self.log.append(str(query).split()[0])
+
+        async def partitions():
+            return
+            yield
+        return SimpleNamespace(partitions=partitions)
+
+    async def commit(self):
+        # SQLAlchemy only talks to the database if the session actually began a transaction
+        if self.in_transaction:
+            self.log.append("COMMIT")
+            self.in_transaction = False
+        self._release()
+
+    async def rollback(self):
+        if self.in_transaction:
+            self.log.append("ROLLBACK")
+            self.in_transaction = False
+        self._release()
+
+    async def close(self):
+        self._release()
+
+
+@pytest.fixture
+def round_trips(monkeypatch):
+    log = RoundTrips()
+    rows = [make_link()]
+    monkeypatch.setattr(dao_dependency, "async_session_maker", lambda: FakeSession(log, rows))
+
+    def read_session(*args, **kwargs):
+        # autocommit sessions never BEGIN, so closing them costs nothing either
+        return lambda: FakeSession(log, rows)
+    monkeypatch.setattr(replica_router, "session_maker", read_session)
+    monkeypatch.setattr(replica_router, "primary", SimpleNamespace(autocommit_session_maker=read_session()))
+    # the lean redirect route checks out a bare connection instead of a session
+    engine = SimpleNamespace(connect=lambda: FakeSession(log, rows))
+    monkeypatch.setattr(replica_router, "route", lambda *args, **kwargs: SimpleNamespace(autocommit_engine=engine))
+    monkeypatch.setattr(code_allocator, "generate_short_code", lambda length: "abc1234")
+    user_cache.set(1, UserSnapshot(id=1, username="counted"))
+    link_cache.clear()
+    yield log
+    user_cache.invalidate(1)
+    link_cache.clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, path, expected", [
+    ("get", "/api/links/list", ["SELECT"]),
+    ("get", "/api/links/stats", ["SELECT"]),
+    ("get", "/abc1234", ["SELECT"]),
+    # lookup, UPDATE ... RETURNING, pg_notify for the other workers' caches, commit
+    ("post", "/api/links/abc1234/deactivate", ["SELECT", "UPDATE", "SELECT", "COMMIT"]),
+    # URL interning, the INSERT, then pg_notify so other workers add the new codes to their short code filters
+    ("post", "/api/links/bulk", ["WITH", "WITH", "SELECT", "COMMIT"]),
+])
+async def test_round_trips_per_endpoint(round_trips, method, path, expected):
+    kwargs = {"json": [{"orig_url": "https://example.com/"}]} if path.endswith("bulk") else {}
+    headers = {"Authorization": f"Bearer {TokenService.create_access_token({'sub': '1'})}"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+        response = await getattr(client, method)(path, **kwargs)
+    assert response.status_code < 400
+    assert round_trips == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/api/links/list", "/api/links/stats", "/api/links/stats/export"])
+async def test_cold_user_cache_adds_one_select_and_no_commit(round_trips, path):
+    user_cache.invalidate(1)
+    headers = {"Authorization": f"Bearer {TokenService.create_access_token({'sub': '1'})}"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+        response = await client.get(path)
+    assert response.status_code < 400
+    # the user lookup, then the route's own query
+    assert round_trips == ["SELECT", "SELECT"]
+
+
+@pytest.mark.asyncio
+async def test_cold_user_cache_on_a_write_holds_one_connection_at_a_time(round_trips):
+    user_cache.invalidate(1)
+    headers = {"Authorization": f"Bearer {TokenService.create_access_token({'sub': '1'})}"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+        response = await client.post("/api/links/create", json={"orig_url": "https://example.com/"})
+    assert response.status_code == 201
+    # the user lookup, then URL interning, the INSERT and pg_notify for the short code filters, then the commit
+    assert round_trips == ["SELECT", "WITH", "WITH", "SELECT", "COMMIT"]
+    # the lookup's connection is back in the pool before the route checks out its own
+    assert round_trips.max_checked_out == 1
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.auth.token_service import TokenService
+from app.rate_limit import InMemoryTokenBuckets, RateLimit, client_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_request(headers=None, host="10.0.0.1"):
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": raw_headers, "client": (host, 1234)})
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_refills_at_rate():
+    clock = FakeClock()
+    buckets = InMemoryTokenBuckets(max_keys=100, clock=clock)
+    assert [await buckets.acquire("k", rate=1.0, burst=2) for _ in range(2)] == [0.0, 0.0]
+    assert await buckets.acquire("k", rate=1.0, burst=2) == pytest.approx(1.0)
+    clock.now = 1.0
+    assert await buckets.acquire("k", rate=1.0, burst=2) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_idle_and_excess_buckets_are_evicted():
+    clock = FakeClock()
+    buckets = InMemoryTokenBuckets(max_keys=2, clock=clock)
+    await buckets.acquire("a", rate=1.0, burst=2)
+    await buckets.acquire("b", rate=1.0, burst=2)
+    await buckets.acquire("c", rate=1.0, burst=2)
+    assert len(buckets) == 2
+    clock.now = 10.0
+    await buckets.acquire("d", rate=1.0, burst=2)
+    assert len(buckets) == 1
+
+
+def test_client_key_prefers_token_subject_over_address():
+    token = TokenService.create_access_token({"sub": "42"})
+    assert client_key(make_request({"Authorization": f"Bearer {token}"})) == "user:42"
+    assert client_key(make_request({"Authorization": "Bearer garbage"})) == "ip:10.0.0.1"
+    assert client_key(make_request()) == "ip:10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_over_limit_request_gets_429_with_retry_after(monkeypatch):
+    from app.config import settings
+    monkeypatch.setitem(settings.RATE_LIMITS, "test.limit", 2)
+    monkeypatch.setattr(RateLimit, "backend", InMemoryTokenBuckets(max_keys=10))
+    limit = RateLimit("test.limit")
+    request = make_request(host="10.0.0.2")
+    await limit(request)
+    await limit(request)
+    with pytest.raises(HTTPException) as raised:
+        await limit(request)
+    assert raised.value.status_code == 429
+    assert raised.value.headers["Retry-After"] == "30"
+    await limit(make_request(host="10.0.0.3"))
@@ -0,0 +1,37 @@
+from app.dao.replica import ReadTarget, ReplicaRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def target(name):
+    return ReadTarget(session_maker=f"{name}-tx", autocommit_session_maker=name, autocommit_engine=f"{name}-engine")
+
+
+def test_reads_round_robin_over_replicas():
+    router = ReplicaRouter(primary=target("primary"), replicas=[target("r1"), target("r2")], sticky_seconds=5)
+    assert [router.session_maker(1) for _ in range(4)] == ["r1", "r2", "r1", "r2"]
+    assert router.session_maker(1, autocommit=False) == "r1-tx"
+
+
+def test_recent_writer_reads_from_primary_until_sticky_window_passes():
+    clock = FakeClock()
+    router = ReplicaRouter(primary=target("primary"), replicas=[target("r1")], sticky_seconds=5, clock=clock)
+    router.mark_write(1)
+    assert router.session_maker(1) == "primary"
+    assert router.session_maker(2) == "r1"
+    assert router.session_maker() == "r1"
+    clock.now = 5.0
+    assert router.session_maker(1) == "r1"
+
+
+def test_without_replicas_everything_goes_to_primary():
+    router = ReplicaRouter(primary=target("primary"), replicas=[], sticky_seconds=5)
+    router.mark_write(1)
+    assert router.session_maker(1) == "primary"
+    assert router.session_maker() == "primary"
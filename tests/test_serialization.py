@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from httpx import AsyncClient, ASGITransport
+from pydantic import TypeAdapter
+
+from app.auth.cache import user_cache, UserSnapshot
+from app.auth.token_service import TokenService
+from app.dao.database import replica_router
+from app.links.schemas import LinkRead
+from app.serialization import trusted_rows
+from main import app
+
+
+def make_links(count):
+    created_at = datetime(2026, 10, 18, 12, 0, 0)
+    return [
+        SimpleNamespace(id=i, orig_url=f"https://example.com/{i}?q=1", short_code=f"code{i:04d}", is_active=i % 2 == 0,
+                        created_at=created_at + timedelta(microseconds=i), expires_at=created_at + timedelta(days=1),
+                        click_count=i, owner_id=1)
+        for i in range(count)
+    ]
+
+
+def test_trusted_rows_render_like_validated_models():
+    links = make_links(3)
+    adapter = TypeAdapter(list[LinkRead])
+    validated = adapter.dump_json(adapter.validate_python(links, from_attributes=True))
+    assert orjson.dumps(trusted_rows(LinkRead, links)) == validated
+
+
+@pytest.mark.asyncio
+async def test_list_is_served_by_orjson_with_cursor_header(monkeypatch):
+    links = make_links(2)
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, query):
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: links))
+
+        async def close(self):
+            pass
+
+    monkeypatch.setattr(replica_router, "session_maker", lambda *args, **kwargs: FakeSession)
+    user_cache.set(1, UserSnapshot(id=1, username="orjson"))
+    headers = {"Authorization": f"Bearer {TokenService.create_access_token({'sub': '1'})}"}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+            response = await client.get("/api/links/list", params={"limit": 2})
+    finally:
+        user_cache.invalidate(1)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "X-Next-Cursor" in response.headers
+    adapter = TypeAdapter(list[LinkRead])
+    assert json.loads(response.content) == json.loads(adapter.dump_json(adapter.validate_python(links, from_attributes=True)))
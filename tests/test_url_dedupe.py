@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.dml import Insert
+
+import app.links.code_allocator as code_allocator
+from app.links.dao import LinksDAO
+from app.links.utils import normalize_url, url_digest
+
+
+def test_normalize_url_only_touches_equivalent_spellings():
+    assert normalize_url("HTTPS://Example.COM:443") == "https://example.com/"
+    assert normalize_url("http://example.com:80/A?b=C#Frag") == "http://example.com/A?b=C#Frag"
+    assert normalize_url("http://User@Example.com:8080/x") == "http://User@example.com:8080/x"
+    assert normalize_url("http://[::1]:80/") == "http://[::1]/"
+    assert url_digest(normalize_url("https://EXAMPLE.com")) == url_digest("https://example.com/")
+    assert len(url_digest("https://example.com/" + "x" * 5000)) == 32
+
+
+class Row:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class FakeSession:
+    """Interns URLs in memory; the owner already has an active link for URL id 0."""
+
+    def __init__(self):
+        self.statements = []
+        self.url_ids = {}
+
+    async def execute(self, query):
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        insert = next((e for e in visitors.iterate(query) if isinstance(e, Insert)), None)
+        params = (query if insert is None else insert).compile(dialect=postgresql.dialect()).params
+
+        class Result:
+            def __init__(self, rows):
+                self._rows = rows
+
+            def all(self):
+                return self._rows
+
+        if "INSERT INTO urls" in sql:
+            self.statements.append("intern")
+            digests = [v for k, v in params.items() if k.startswith("url_hash")]
+            return Result([Row(id=self.url_ids.setdefault(d, len(self.url_ids)), url_hash=d) for d in digests])
+        if "INSERT INTO links" in sql:
+            self.statements.append("insert")
+            codes = [v for k, v in params.items() if k.startswith("short_code")]
+            url_ids = [v for k, v in params.items() if k.startswith("url_id")]
+            return Result([Row(short_code=code, url_id=url_id) for code, url_id in zip(codes, url_ids)])
+        if "pg_advisory_xact_lock" in sql:
+            self.statements.append("lock")
+            return Result([])
+        self.statements.append("lookup")
+        url_ids = next(v for k, v in params.items() if k.startswith("url_id"))
+        return Result([Row(short_code="existing", url_id=url_id) for url_id in url_ids if url_id == 0])
+
+
+@pytest.mark.asyncio
+async def test_dedupe_reuses_active_link_and_batch_duplicates(monkeypatch):
+    codes = iter(["new1", "new2"])
+    monkeypatch.setattr(code_allocator, "generate_short_code", lambda length: next(codes))
+    session = FakeSession()
+    created = await LinksDAO(session).create_links(
+        ["https://a.com/", "https://B.com", "https://a.com:443/", "https://b.com/"], owner_id=1, dedupe=True,
+    )
+    assert [row.short_code for row in created] == ["existing", "new1", "existing", "new1"]
+    # the lookup runs under per-URL locks, then one INSERT carries only the new URL
+    assert session.statements == ["intern", "lock", "lookup", "insert"]
+
+
+@pytest.mark.asyncio
+async def test_without_dedupe_every_url_gets_a_link(monkeypatch):
+    codes = iter(["new1", "new2"])
+    monkeypatch.setattr(code_allocator, "generate_short_code", lambda length: next(codes))
+    session = FakeSession()
+    created = await LinksDAO(session).create_links(["https://a.com/", "https://a.com/"], owner_id=1)
+    assert [row.short_code for row in created] == ["new1", "new2"]
+    assert [row.url_id for row in created] == [0, 0]
+    assert session.statements == ["intern", "insert"]
@@ -0,0 +1,53 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.auth.cache import user_cache, cache_user, invalidate_user
+from app.auth.token_service import TokenService
+from app.dao.database import replica_router
+from app.dependencies.auth_dependency import get_current_user
+
+
+class FakeSession:
+    def __init__(self):
+        self.queries = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        self.queries += 1
+
+        class Result:
+            def scalar_one_or_none(self):
+                return type("User", (), {"id": 7, "username": "cached", "password_hash": "hash"})()
+        return Result()
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_loaded_once_and_invalidated(monkeypatch):
+    user_cache.clear()
+    token = TokenService.create_access_token({"sub": "7"})
+    session = FakeSession()
+    monkeypatch.setattr(replica_router, "primary", SimpleNamespace(autocommit_session_maker=lambda: session))
+    first = await get_current_user(token=token)
+    second = await get_current_user(token=token)
+    assert first == second
+    assert (second.id, second.username) == (7, "cached")
+    assert session.queries == 1
+    invalidate_user(7)
+    await get_current_user(token=token)
+    assert session.queries == 2
+
+
+def test_cached_user_does_not_outlive_token():
+    user_cache.clear()
+    user = type("User", (), {"id": 8, "username": "expiring"})()
+    cache_user(user, token_exp=time.time() - 1)
+    assert user_cache.get(8) is None
+    cache_user(user, token_exp=time.time() + 60)
+    assert user_cache.get(8) is not None
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app import warmup
+from app.links.cache import link_cache
+
+
+class FakeTransaction:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def rollback(self):
+        self.connection.rolled_back = True
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.rolled_back = False
+
+    async def __aenter__(self):
+        self.engine.open += 1
+        self.engine.max_open = max(self.engine.max_open, self.engine.open)
+        # yield so that every connect() is in flight before any is returned
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.engine.open -= 1
+        return False
+
+    async def begin(self):
+        return FakeTransaction(self)
+
+    async def execute(self, query, *args, **kwargs):
+        self.statements.append(str(query))
+        # nothing matches the sample code
+        return SimpleNamespace(first=lambda: None, one_or_none=lambda: None, scalar_one_or_none=lambda: None)
+
+
+class FakeEngine:
+    def __init__(self, pool_size):
+        self.pool = SimpleNamespace(size=lambda: pool_size)
+        self.url = SimpleNamespace(render_as_string=lambda hide_password: "postgresql://test")
+        self.open = 0
+        self.max_open = 0
+        self.connections = []
+
+    def connect(self):
+        connection = FakeConnection(self)
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_holds_connections_at_once_and_rolls_back():
+    engine = FakeEngine(pool_size=3)
+    opened = await warmup.warm_pool(engine, connections=5, primary=True)
+    # capped at the pool size, all open together so each one gets primed
+    assert opened == 3
+    assert engine.max_open == 3 and engine.open == 0
+    assert all(c.rolled_back and c.statements for c in engine.connections)
+
+
+@pytest.mark.asyncio
+async def test_replica_warm_up_only_prepares_reads():
+    primary, replica = FakeEngine(pool_size=1), FakeEngine(pool_size=1)
+    await warmup.warm_pool(primary, connections=1, primary=True)
+    await warmup.warm_pool(replica, connections=1, primary=False)
+    assert len(replica.connections[0].statements) < len(primary.connections[0].statements)
+    assert not any("UPDATE" in s or "NOTIFY" in s for s in replica.connections[0].statements)
+
+
+@pytest.mark.asyncio
+async def test_preload_fills_link_cache(monkeypatch):
+    expires_at = datetime.now() + timedelta(days=1)
+    rows = [SimpleNamespace(short_code="hot1", orig_url="https://a.example/", is_active=True, expires_at=expires_at)]
+    seen = {}
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def get_hot_links(self, since, limit):
+        seen["limit"] = limit
+        return rows
+
+    monkeypatch.setattr(warmup.LinksDAO, "get_hot_links", get_hot_links)
+    try:
+        assert await warmup.preload_link_cache(FakeSession, limit=10) == 1
+        assert seen["limit"] == 10
+        assert link_cache.get("hot1").orig_url == "https://a.example/"
+    finally:
+        link_cache.invalidate("hot1")
+
+
+@pytest.mark.asyncio
+async def test_preload_waits_for_invalidation_listener(monkeypatch):
+    loaded = []
+
+    async def preload_link_cache(session_factory, limit):
+        loaded.append(limit)
+        return 0
+
+    monkeypatch.setattr(warmup, "preload_link_cache", preload_link_cache)
+    monkeypatch.setattr(warmup.settings, "CACHE_PRELOAD_TIMEOUT_SECONDS", 0.01)
+    listener = SimpleNamespace(connected=asyncio.Event())
+    await warmup.warm_up([], None, listener)
+    assert loaded == []
+    listener.connected.set()
+    await warmup.warm_up([], None, listener)
+    assert loaded == [warmup.settings.CACHE_PRELOAD_LINKS]